@@ -0,0 +1,71 @@
+# Порівняння рендерів кругової діаграми: matplotlib і native (utils/native_chart.py).
+# Кожен рендер міряється в окремому процесі: імпорт, перше малювання (для matplotlib —
+# разом із завантаженням pyplot), середній час, розмір PNG і пікова пам'ять процесу.
+#
+#   python benchmarks/bench_charts.py [--runs 20] [--categories 8]
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+runs, categories, renderer = {runs}, {categories}, {renderer!r}
+
+t0 = time.perf_counter()
+if renderer == "native":
+    from utils.native_chart import donut_png
+else:
+    from utils.chart_render import matplotlib_donut_png as donut_png
+import_time = time.perf_counter() - t0
+
+data = {{f"Категорія {{i + 1}}": 100.0 + 37 * i for i in range(categories)}}
+t0 = time.perf_counter()
+png = donut_png(data, "Розподіл витрат")
+first = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+for i in range(runs):
+    data[f"Категорія 1"] += 1  # щоразу інші дані, щоб не міряти кеш
+    donut_png(data, "Розподіл витрат")
+steady = (time.perf_counter() - t0) / runs
+
+print(json.dumps({{
+    "import_ms": import_time * 1000,
+    "first_ms": first * 1000,
+    "render_ms": steady * 1000,
+    "png_kb": len(png) / 1024,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def measure(renderer, runs, categories):
+    code = CHILD.format(root=ROOT, runs=runs, categories=categories, renderer=renderer)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--categories", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'рендер':<12}{'імпорт, мс':>12}{'перше, мс':>12}{'далі, мс':>12}{'PNG, КБ':>10}{'пам., МБ':>10}")
+    for renderer in ("matplotlib", "native"):
+        try:
+            r = measure(renderer, args.runs, args.categories)
+        except subprocess.CalledProcessError as e:
+            print(f"{renderer:<12} помилка: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{renderer:<12}{r['import_ms']:>12.1f}{r['first_ms']:>12.1f}{r['render_ms']:>12.1f}"
+              f"{r['png_kb']:>10.1f}{r['rss_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
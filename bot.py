@@ -1,9 +1,12 @@
+import time
+
+STARTED = time.perf_counter()  # для вимірювання часу запуску
+
 import discord
 from discord.ext import commands
 from config import TOKEN
 from utils.helpers import ensure_files
-
-ensure_files()  # ✅ важливо
+from utils.startup import sync_commands, record_startup
 
 import os
 
@@ -11,22 +14,39 @@ intents = discord.Intents.default()
 intents.message_content = True
 
 bot = commands.Bot(command_prefix="!", intents=intents)
+IMPORTED = time.perf_counter()
+stages = {}
 
 
 @bot.event
 async def on_ready():
     print(f"✅ Бот увійшов як {bot.user}")
-    await bot.tree.sync()
+    # on_ready приходить і після кожного перепідключення — запуск фіксуємо один раз
+    if "ready" in stages:
+        return
+    stages["ready"] = time.perf_counter()
+    timings = record_startup(STARTED, imports=IMPORTED, **stages)
+    print(f"⏱ Запуск: {timings}")
+    if await sync_commands(bot.tree, bot.application_id):
+        print("🔄 Команди синхронізовано")
 
 
 async def load_cogs():
     await bot.load_extension("cogs.ui.ui")
     await bot.load_extension("cogs.income.menu")
+    await bot.load_extension("cogs.income.auto")
+    await bot.load_extension("cogs.storage")
+    await bot.load_extension("cogs.statements")
 
 
 @bot.event
 async def setup_hook():
     await load_cogs()
+    stages["cogs"] = time.perf_counter()
 
 
-bot.run(TOKEN)
+# процеси пулу малювання (spawn) імпортують цей модуль заново — бот запускається лише тут
+if __name__ == "__main__":
+    ensure_files()  # ✅ важливо
+    stages["files"] = time.perf_counter()
+    bot.run(TOKEN)
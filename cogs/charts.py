@@ -1,72 +1,101 @@
-import matplotlib.pyplot as plt
 from io import BytesIO
 from discord import File
-from collections import defaultdict
 
-from utils.helpers import load_data, INCOME_FILE, AUTO_INCOME_FILE, EXPENSES_FILE
+from utils import render_pool
+from utils.async_store import store
+from utils.chart_cache import chart_cache
+from utils.chart_render import donut_png, series_png
+from utils.helpers import INCOME_FILE, EXPENSES_FILE
+from utils.summary import load_summary, load_series
 
 
-async def draw_donut_chart(interaction, data: dict, title: str):
-    if not data:
-        await interaction.response.send_message("📭 Немає даних для побудови діаграми.", ephemeral=True)
-        return
-
-    labels = list(data.keys())
-    values = list(data.values())
+async def render_chart(interaction, render, *args):
+    # малювання триває довше за 3 секунди на підтвердження — спершу відкладаємо відповідь;
+    # None — не вдалося, користувач уже отримав повідомлення про помилку
+    if not interaction.response.is_done():
+        await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        return await render_pool.run(render, *args)
+    except Exception as e:
+        print(f"[!] Не вдалося побудувати діаграму: {e}")
+        await interaction.followup.send("❌ Не вдалося побудувати діаграму, спробуйте пізніше.", ephemeral=True)
+        return None
 
-    colors = plt.get_cmap('Set3').colors
 
-    fig, ax = plt.subplots(figsize=(6, 6))
-    wedges, texts, autotexts = ax.pie(
-        values,
-        labels=labels,
-        autopct='%1.1f%%',
-        startangle=90,
-        colors=colors,
-        textprops={'fontsize': 14}
-    )
+async def render_donut_chart(interaction, data: dict, title: str):
+    return await render_chart(interaction, donut_png, data, title)
 
-    ax.set_title(title, fontsize=16)
 
-    buf = BytesIO()
-    plt.tight_layout()
-    plt.savefig(buf, format='png')
-    buf.seek(0)
-    plt.close(fig)
+async def send_chart(interaction, png: bytes, title: str):
+    file = File(BytesIO(png), filename="chart.png")
+    if interaction.response.is_done():
+        await interaction.followup.send(f"📈 {title}:", file=file, ephemeral=True)
+    else:
+        await interaction.response.send_message(f"📈 {title}:", file=file, ephemeral=True)
 
-    file = File(buf, filename="chart.png")
-    await interaction.response.send_message(f"📈 {title}:", file=file, ephemeral=True)
 
+async def draw_donut_chart(interaction, data: dict, title: str):
+    if not data:
+        await interaction.response.send_message("📭 Немає даних для побудови діаграми.", ephemeral=True)
+        return
+    png = await render_donut_chart(interaction, data, title)
+    if png is not None:
+        await send_chart(interaction, png, title)
 
-# 🔽 Діаграма прибутків (включає також автоматичні прибутки)
-async def show_income_chart(interaction):
-    user_id = str(interaction.user.id)
 
-    income_data = load_data(INCOME_FILE).get(user_id, [])
-    auto_income_data = load_data(AUTO_INCOME_FILE).get(user_id, [])
+async def show_cached_chart(interaction, user_id, kind, version, load_data, title, render=donut_png):
+    # та сама версія даних — та сама картинка, без повторного малювання
+    user_id = str(user_id)
+    png = chart_cache.get(user_id, kind, version)
+    if png is None:
+        # читання даних теж може тривати — відповідь відкладаємо ще до нього
+        if not interaction.response.is_done():
+            await interaction.response.defer(ephemeral=True, thinking=True)
+        data = await load_data()
+        if not data:
+            await interaction.followup.send("📭 Немає даних для побудови діаграми.", ephemeral=True)
+            return
+        png = await render_chart(interaction, render, data, title)
+        if png is None:
+            return
+        chart_cache.put(user_id, kind, version, png)
+    await send_chart(interaction, png, title)
 
-    summary = defaultdict(float)
 
-    for e in income_data:
-        cat = e.get("category", "Без категорії")
-        summary[cat] += float(e.get("amount", 0))
+# 🔽 Діаграма прибутків
+async def show_income_chart(interaction, user_id=None):
+    user_id = str(user_id or interaction.user.id)
 
-    for e in auto_income_data:
-        cat = e.get("category", "Без категорії")
-        summary[cat] += float(e.get("amount", 0))
+    async def load_data():
+        return (await load_summary(user_id, expenses=False)).income_chart()
 
-    await draw_donut_chart(interaction, summary, "Розподіл прибутків")
+    version = store.version(INCOME_FILE, user_id)
+    await show_cached_chart(interaction, user_id, "income", version, load_data, "Розподіл прибутків")
 
 
 # 🔽 Діаграма витрат
-async def show_expense_chart(interaction):
-    user_id = str(interaction.user.id)
+async def show_expense_chart(interaction, user_id=None):
+    user_id = str(user_id or interaction.user.id)
+
+    async def load_data():
+        return (await load_summary(user_id, income=False)).expense_chart()
+
+    version = store.version(EXPENSES_FILE, user_id)
+    await show_cached_chart(interaction, user_id, "expenses", version, load_data, "Розподіл витрат")
+
 
-    expense_data = load_data(EXPENSES_FILE).get(user_id, [])
+# 🔽 Динаміка прибутків і витрат за днями або тижнями
+async def show_series_chart(interaction, user_id, date_from, date_to, period="day"):
+    user_id = str(user_id)
 
-    summary = defaultdict(float)
-    for entry in expense_data:
-        if entry["amount"] > 0:
-            summary[entry["category"]] += entry["amount"]
+    async def load_data():
+        series = await load_series(user_id, date_from, date_to, period)
+        if not any(p[0] for p in series.income) and not any(p[0] for p in series.expenses):
+            return None
+        return series.to_plain()
 
-    await draw_donut_chart(interaction, summary, "Розподіл витрат")
+    # різні періоди — різні картинки; версія — обидва файли
+    kind = f"series:{period}:{date_from.toordinal()}:{date_to.toordinal()}"
+    version = (store.version(INCOME_FILE, user_id), store.version(EXPENSES_FILE, user_id))
+    title = f"Динаміка {date_from.strftime('%d/%m/%Y')} — {date_to.strftime('%d/%m/%Y')}"
+    await show_cached_chart(interaction, user_id, kind, version, load_data, title, render=series_png)
@@ -1,16 +1,20 @@
+import asyncio
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord.ui import View, Button
 from discord import Interaction
-from datetime import datetime, timedelta
-from utils.helpers import load_data, save_data
+from datetime import datetime
+from utils.async_store import store
+from utils.auto_schedule import auto_scheduler, format_fire, occurrences, occurrence_key
 from .modals import AutoDeleteModal
 from .menu import IncomeMenuView
 from utils.helpers import AUTO_INCOME_FILE 
+from utils.notifier import Notifier
 
 INCOME_FILE = "data/income.json"
 EXPENSES_FILE = "data/expenses.json"
 AUTO_INCOME_FILE = "data/auto_income.json"
+RETRY_DELAY = 60  # секунд між повторами після помилки
 
 
 class AutoIncomeMenuView(View):
@@ -19,7 +23,7 @@ class AutoIncomeMenuView(View):
         self.user_id = str(user_id)
 
     async def send_with_summary(self, interaction):
-        auto_data = load_data(AUTO_INCOME_FILE).get(self.user_id, [])
+        auto_data = await store.get(AUTO_INCOME_FILE, self.user_id, [])
         if not auto_data:
             content = "📥 Меню автоматичних прибутків:\n*Немає активних автоприбутків.*"
         else:
@@ -43,63 +47,112 @@ class AutoIncomeMenuView(View):
 class AutoEntries(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.auto_checker.start()
+        self.task = None
+        self.notifier = Notifier(bot)
+
+    async def cog_load(self):
+        self.notifier.start()
+        self.task = asyncio.create_task(self.auto_checker())
 
     def cog_unload(self):
-        self.auto_checker.cancel()
+        if self.task is not None:
+            self.task.cancel()
+        self.notifier.stop()
 
-    @tasks.loop(minutes=1)
     async def auto_checker(self):
-        now = datetime.now()
-        await self.check_auto(
-            bot=self.bot,
-            source_file=AUTO_INCOME_FILE,
-            target_file=INCOME_FILE,
-            entry_type="прибуток",
-            now=now,
-            time_now=now.strftime("%H:%M"),
-            weekday=now.strftime("%A"),
-            day=now.day
-        )
-
-    async def check_auto(self, bot, source_file, target_file, entry_type, now, time_now, weekday, day):
-        data = load_data(source_file)
-        target = load_data(target_file)
-
-        for user_id, entries in data.items():
+        # замість щохвилинної перевірки — сон до найближчого next_fire з купи;
+        # одразу після запуску купа вже містить пропущені за час простою шаблони
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                await auto_scheduler.load(datetime.now())
+                break
+            except Exception as e:
+                print(f"[!] Не вдалося завантажити автоприбутки: {e}")
+                await asyncio.sleep(RETRY_DELAY)
+        print(f"[i] Автоприбутків у розкладі: {len(auto_scheduler)}")
+        while True:
+            await auto_scheduler.wait()
+            now = datetime.now()
+            due = auto_scheduler.pop_due(now)
+            try:
+                await self.check_auto(
+                    source_file=AUTO_INCOME_FILE,
+                    target_file=INCOME_FILE,
+                    entry_type="прибуток",
+                    due=due,
+                    now=now
+                )
+            except Exception as e:
+                # зняті з купи шаблони повертаються і проводяться повторно (записи не дублюються
+                # завдяки id спрацювань); пауза — щоб стійка помилка не крутила цикл
+                print(f"[!] Помилка автоприбутків: {e}")
+                auto_scheduler.restore(due)
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def check_auto(self, source_file, target_file, entry_type, due, now):
+        # один прохід на всі шаблони, що настали: кожен проводить усі спрацювання від
+        # last_posted до now (після простою — всі пропущені), записи — однією пачкою
+        updated = {}  # {user_id: {id шаблону: (last_posted, з якого моменту планувати наступне)}}
+        posted = []
+        for user_id, fired in due.items():
+            entries = await store.get(source_file, user_id, [])
+            new_records = []
             for e in entries:
-                matched = False
-                if e["interval"] == "daily" and e.get("time") == time_now:
-                    matched = True
-                elif e["interval"] == "weekly" and e.get("day_of_week") == weekday and e.get("time") == time_now:
-                    matched = True
-                elif e["interval"] == "monthly":
-                    target_day = e.get("day_of_month")
-                    if target_day is None:
+                fire = fired.get(e.get("id"))
+                # шаблон видалили або переплановано — у купі лишився застарілий запис
+                if fire is None or e.get("next_fire") != format_fire(fire):
+                    continue
+                fires = occurrences(e, now)
+                count = 0
+                for occurrence in fires:
+                    key = occurrence_key(e, occurrence)
+                    # вже проведене (наприклад, бот упав до збереження last_posted) — не дублюємо
+                    if await store.get_entry(target_file, user_id, key) is not None:
                         continue
-
-                    last_day = (now.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
-                    actual_day = last_day.day
-
-                    if target_day >= now.day and now.day == actual_day:
-                        matched = True
-                    elif target_day == now.day:
-                        matched = True
-
-                if matched:
-                    target.setdefault(user_id, []).append({
+                    new_records.append({
+                        "id": key,
                         "category": e["category"],
                         "amount": e["amount"],
-                        "date": now.strftime("%d/%m/%Y")
+                        "day": occurrence.toordinal()
                     })
-                    print(f"[✓] Авто-{entry_type} записано для {user_id} → {e['amount']} грн [{e['category']}]")
-                    try:
-                        user = await bot.fetch_user(int(user_id))
-                        await user.send(f"📥 Додано автоматичний **{entry_type}**: {e['category']} — {e['amount']} грн")
-                    except:
-                        pass
-
-        save_data(target_file, target)
+                    count += 1
+                last_posted = format_fire(fires[-1]) if fires else e.get("last_posted")
+                if count:
+                    posted.append((user_id, e, count))
+                updated.setdefault(user_id, {})[e["id"]] = (last_posted, max(fire, now))
+            if new_records:
+                await store.append_many(target_file, user_id, new_records)
+
+        # спершу записи, потім позначки last_posted: якщо записи не дійшли до диска, шаблони
+        # не чіпаємо — прохід повториться (див. auto_checker), а id спрацювань не дадуть дублів
+        if not await store.flush(target_file):
+            raise OSError(f"не вдалося записати {target_file}")
+        for user_id, marks in updated.items():
+            # шаблони читаються заново і одразу зберігаються (без await між ними): додані чи
+            # видалені під час проходу не губляться і не повертаються; змінюються лише позначки
+            entries = [dict(e) for e in await store.get(source_file, user_id, [])]
+            for e in entries:
+                if e.get("id") in marks:
+                    last_posted, after = marks[e["id"]]
+                    if last_posted is not None:
+                        e["last_posted"] = last_posted
+                    auto_scheduler.schedule(user_id, e, after)
+            await store.set(source_file, user_id, entries)
+        await store.flush(source_file)
+
+        # одне повідомлення на користувача, навіть якщо спрацювало кілька шаблонів
+        lines = {}
+        for user_id, e, count in posted:
+            times = f" ×{count}" if count > 1 else ""
+            print(f"[✓] Авто-{entry_type} записано для {user_id} → {e['amount']} грн{times} [{e['category']}]")
+            lines.setdefault(user_id, []).append(f"{e['category']} — {e['amount']} грн{times}")
+        for user_id, items in lines.items():
+            if len(items) == 1:
+                text = f"📥 Додано автоматичний **{entry_type}**: {items[0]}"
+            else:
+                text = f"📥 Додано автоматичні записи ({entry_type}):\n" + "\n".join(f"• {item}" for item in items)
+            await self.notifier.notify(user_id, text)
 
 
 async def setup(bot):
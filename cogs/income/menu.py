@@ -1,17 +1,19 @@
 import discord
 from discord.ui import View, Button
-from utils.helpers import load_data
+from utils.helpers import INCOME_CATEGORIES_FILE
+from utils.async_store import store
 from .modals import AddIncomeModal, AutoIncomeIntervalView
 from cogs.report import IncomeCategorySelectForDetail
 from cogs.charts import show_income_chart
 from cogs.ui.base_category import BaseCategoryManagerView
+from utils.summary import load_summary
 
 from discord.ext import commands
 
 INCOME_FILE = "data/income.json"
 AUTO_INCOME_FILE = "data/auto_income.json"
 
-IncomeCategoryManagerView = lambda user_id: BaseCategoryManagerView(user_id, is_income=True)
+IncomeCategoryManagerView = lambda user_id: BaseCategoryManagerView.load(user_id, is_income=True)
 class IncomeUI(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -24,8 +26,7 @@ class IncomeMenuView(View):
 
     @discord.ui.button(label="➕ Новий прибуток", style=discord.ButtonStyle.success)
     async def add_income(self, interaction: discord.Interaction, button: Button):
-        data = load_data("data/income_categories.json")
-        categories = data.get(str(self.user_id), [])
+        categories = await store.get(INCOME_CATEGORIES_FILE, self.user_id, [])
         if not categories:
             await interaction.response.send_message("⚠️ У вас ще немає категорій для прибутку. Додайте їх у меню 'Категорії'.", ephemeral=True)
             return
@@ -56,37 +57,14 @@ class IncomeMenuView(View):
         
     @discord.ui.button(label="📊 Звіт", style=discord.ButtonStyle.secondary)
     async def show_report(self, interaction: discord.Interaction, button: Button):
-        income_data = load_data(INCOME_FILE)
-        auto_data = load_data(AUTO_INCOME_FILE)
-
-        incomes = income_data.get(self.user_id, [])
-        autos = auto_data.get(self.user_id, [])
-
-        # Побудуємо мапу автоприбутків: категорія → підпис
-        auto_labels = {
-            e["category"]: f"{e['category']} [автоматично - " + {
-                "daily": "щодня",
-                "weekly": "щотижня",
-                "monthly": "щомісяця"
-            }[e["interval"]] + "]"
-            for e in autos
-        }
-
-        summary = {}
-        for entry in incomes:
-            raw_cat = entry.get("category", "Без категорії")
-            amount = float(entry.get("amount", 0))
-            display_cat = auto_labels.get(raw_cat, raw_cat)  # якщо це автоприбуток — змінюємо підпис
-            summary[display_cat] = summary.get(display_cat, 0) + amount
-
-        # Не додаємо штучно 0.0 грн для автоприбутків, які ще не активувались — тільки якщо вони вже є в income.json
-
-        total = sum(summary.values())
-        text = "\n".join([f"• **{cat}**: {amt:.2f} грн" for cat, amt in summary.items()])
-        text += f"\n\n**Загалом:** {total:.2f} грн"
+        summary = await load_summary(self.user_id, expenses=False)
+
+        # категорії автоприбутків підписуються інтервалом; суми — лише з уже доданих записів
+        text = "\n".join([f"• **{cat}**: {amt:.2f} грн" for cat, amt in summary.labeled_income().items()])
+        text += f"\n\n**Загалом:** {summary.total_income:.2f} грн"
 
         await interaction.response.defer(ephemeral=True)
-        await interaction.followup.send(text, view=IncomeCategorySelectForDetail(self.user_id))
+        await interaction.followup.send(text, view=IncomeCategorySelectForDetail(self.user_id, summary.income_categories()))
 
         
     @discord.ui.button(label="📈 Діаграма", style=discord.ButtonStyle.secondary)
@@ -96,7 +74,7 @@ class IncomeMenuView(View):
 
     @discord.ui.button(label="⚙️ Категорії", style=discord.ButtonStyle.secondary)
     async def manage_categories(self, interaction: discord.Interaction, button: Button):
-        await interaction.response.send_message("🔧 Редагування категорій:", ephemeral=True, view=IncomeCategoryManagerView(self.user_id))
+        await interaction.response.send_message("🔧 Редагування категорій:", ephemeral=True, view=await IncomeCategoryManagerView(self.user_id))
         msg = await interaction.original_response()
         key = (interaction.channel.id, interaction.user.id)
         cog = interaction.client.get_cog("UI")
@@ -1,7 +1,9 @@
 import discord
 from discord.ui import Modal, TextInput
-from utils.helpers import load_data, save_data
+from utils.async_store import store
+from utils.auto_schedule import auto_scheduler
 from datetime import datetime
+from utils.dates import parse_day, format_day, today
 from discord import Interaction
 from discord.ui import View, Select
 
@@ -22,8 +24,6 @@ class AutoIncomeModal(Modal):
         self.add_item(self.amount)
 
     async def on_submit(self, interaction: discord.Interaction):
-        data = load_data(AUTO_INCOME_FILE)
-
         income_entry = {
             "category": self.category.value,
             "amount": float(self.amount.value),
@@ -37,8 +37,10 @@ class AutoIncomeModal(Modal):
         elif self.interval == "monthly":
             income_entry["day_of_month"] = datetime.now().day
 
-        data.setdefault(self.user_id, []).append(income_entry)
-        save_data(AUTO_INCOME_FILE, data)
+        auto_scheduler.schedule(self.user_id, income_entry, datetime.now())  # id і next_fire
+        entries = await store.get(AUTO_INCOME_FILE, self.user_id, [])
+        entries.append(income_entry)
+        await store.set(AUTO_INCOME_FILE, self.user_id, entries)
 
         await interaction.response.send_message(
             f"✅ Автоматичний прибуток створено: {income_entry['category']} — {income_entry['amount']} грн",
@@ -50,13 +52,11 @@ class AutoDeleteModal(Modal, title="Видалити автоприбуток"):
     category = TextInput(label="Категорія для видалення")
 
     async def on_submit(self, interaction: Interaction):
-        from utils.helpers import load_data, save_data, AUTO_INCOME_FILE
+        from utils.helpers import AUTO_INCOME_FILE
         user_id = str(interaction.user.id)
-        data = load_data(AUTO_INCOME_FILE)
-        entries = data.get(user_id, [])
+        entries = await store.get(AUTO_INCOME_FILE, user_id, [])
         new_entries = [e for e in entries if e["category"] != self.category.value]
-        data[user_id] = new_entries
-        save_data(AUTO_INCOME_FILE, data)
+        await store.set(AUTO_INCOME_FILE, user_id, new_entries)
         await interaction.response.send_message("🗑️ Прибуток видалено (якщо існував).", ephemeral=True)
 
 
@@ -78,29 +78,19 @@ class AddIncomeModal(Modal, title="Додавання прибутку"):
             return
 
         raw_date = self.date.value.strip()
-        if not raw_date:
-            date = datetime.now()
-        else:
-            if raw_date.isdigit() and len(raw_date) == 8:
-                raw_date = f"{raw_date[:2]}/{raw_date[2:4]}/{raw_date[4:]}"
-            try:
-                date = datetime.strptime(raw_date, "%d/%m/%Y")
-            except ValueError:
-                await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
-                return
-
-        data = load_data(INCOME_FILE)
-        user_incomes = data.get(self.user_id, [])
-        user_incomes.append({
+        day = parse_day(raw_date) if raw_date else today()
+        if day is None:
+            await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
+            return
+
+        await store.append(INCOME_FILE, self.user_id, {
             "category": self.category,
             "amount": amount_value,
-            "date": date.strftime("%d/%m/%Y")
+            "day": day
         })
-        data[self.user_id] = user_incomes
-        save_data(INCOME_FILE, data)
 
         await interaction.response.send_message(
-            f"✅ Збережено {amount_value:.2f} грн в категорії **{self.category}** на {date.strftime('%d/%m/%Y')}",
+            f"✅ Збережено {amount_value:.2f} грн в категорії **{self.category}** на {format_day(day)}",
             ephemeral=True
         )
 class AutoIncomeIntervalView(View):
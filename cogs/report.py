@@ -1,43 +1,32 @@
 import discord
 from discord import ButtonStyle, SelectOption, File
 from discord.ui import View, Select, Button, Modal, TextInput
-from datetime import datetime
+from utils.dates import parse_day
 from discord import Interaction
-from utils.helpers import load_data, save_data, AUTO_INCOME_FILE, EXPENSES_FILE
+from utils.helpers import AUTO_INCOME_FILE, EXPENSES_FILE
+from utils.async_store import store
 
 INCOME_FILE = "data/income.json"
 
 class IncomeCategorySelectForDetail(View):
-    def __init__(self, user_id):
+    def __init__(self, user_id, categories):
         super().__init__(timeout=60)
-        self.add_item(IncomeCategoryDetailDropdown(user_id))
+        self.add_item(IncomeCategoryDetailDropdown(user_id, categories))
 
 class IncomeCategoryDetailDropdown(Select):
-    def __init__(self, user_id):
+    def __init__(self, user_id, categories):
         self.user_id = user_id
-        data = load_data(INCOME_FILE)
-        incomes = data.get(self.user_id, [])
-
-        categories = sorted(set(e.get("category", "Без категорії") for e in incomes))
         options = [SelectOption(label=cat) for cat in categories]
         super().__init__(placeholder="Оберіть категорію для деталей", options=options)
 
     async def callback(self, interaction: Interaction):
         selected = self.values[0]
-        data = load_data(INCOME_FILE)
-        incomes = data.get(self.user_id, [])
-
-        filtered = [e for e in incomes if e.get("category") == selected]
+        filtered = await store.find(INCOME_FILE, self.user_id, category=selected)  # уже впорядковані за датою
 
         if not filtered:
             await interaction.response.send_message("Прибутків для цієї категорії немає.", ephemeral=True)
             return
 
-        try:
-            filtered.sort(key=lambda x: datetime.strptime(x["date"], "%d/%m/%Y"))
-        except Exception:
-            pass
-
         details = "\n".join(
             f"{e['amount']} грн — {e.get('date', '⏳ ще не активовано')}"
             for e in filtered
@@ -46,8 +35,8 @@ class IncomeCategoryDetailDropdown(Select):
         options = [
             SelectOption(
                 label=f"{e['amount']} грн — {e['date']}",
-                value=f"{e['amount']}#{e['date']}#{i}"
-            ) for i, e in enumerate(filtered)
+                value=e["id"]
+            ) for e in filtered
         ]
         await interaction.response.defer()
         await interaction.channel.send(
@@ -66,43 +55,39 @@ class EditIncomeEntryDropdown(Select):
         super().__init__(placeholder="Оберіть запис", options=options)
 
     async def callback(self, interaction: Interaction):
-        raw = self.values[0]
-        amount, date, _ = raw.split("#")
+        entry = await store.get_entry(INCOME_FILE, self.user_id, self.values[0])
+        if entry is None:
+            await interaction.response.send_message("❌ Прибуток не знайдено.", ephemeral=True)
+            return
         await interaction.response.defer()
         await interaction.channel.send(
-            f"Що бажаєте зробити з прибутком {amount} грн — {date}?",
-            view=IncomeEditDeleteView(self.user_id, float(amount), date)
+            f"Що бажаєте зробити з прибутком {entry['amount']} грн — {entry['date']}?",
+            view=IncomeEditDeleteView(self.user_id, entry)
         )
 
 class IncomeEditDeleteView(View):
-    def __init__(self, user_id, old_amount, old_date):
+    def __init__(self, user_id, entry):
         super().__init__(timeout=60)
         self.user_id = user_id
-        self.old_amount = old_amount
-        self.old_date = old_date
+        self.entry = entry
 
     @discord.ui.button(label="✏️ Редагувати", style=ButtonStyle.primary)
     async def edit(self, interaction: Interaction, button: Button):
-        await interaction.response.send_modal(EditIncomeModal(self.user_id, self.old_amount, self.old_date))
+        await interaction.response.send_modal(EditIncomeModal(self.user_id, self.entry))
 
     @discord.ui.button(label="🗑 Видалити", style=ButtonStyle.danger)
     async def delete(self, interaction: Interaction, button: Button):
-        data = load_data(INCOME_FILE)
-        incomes = data.get(self.user_id, [])
-        updated = [e for e in incomes if not (float(e["amount"]) == self.old_amount and e["date"] == self.old_date)]
-        data[self.user_id] = updated
-        save_data(INCOME_FILE, data)
+        await store.delete(INCOME_FILE, self.user_id, self.entry["id"])
         await interaction.response.send_message("🗑 Прибуток видалено.", ephemeral=True)
 
 class EditIncomeModal(Modal, title="Редагування"):
-    def __init__(self, user_id, old_amount, old_date):
+    def __init__(self, user_id, entry):
         super().__init__()
         self.user_id = user_id
-        self.old_amount = old_amount
-        self.old_date = old_date
+        self.entry_id = entry["id"]
 
-        self.amount = TextInput(label="Нова сума", default=str(old_amount))
-        self.date = TextInput(label="Нова дата (ДД/ММ/РРРР або 01042025)", default=old_date)
+        self.amount = TextInput(label="Нова сума", default=str(entry["amount"]))
+        self.date = TextInput(label="Нова дата (ДД/ММ/РРРР або 01042025)", default=entry["date"])
         self.add_item(self.amount)
         self.add_item(self.date)
 
@@ -113,60 +98,41 @@ class EditIncomeModal(Modal, title="Редагування"):
             await interaction.response.send_message("❌ Невірна сума.", ephemeral=True)
             return
 
-        raw_date = self.date.value.strip()
-        if raw_date.isdigit() and len(raw_date) == 8:
-            raw_date = f"{raw_date[:2]}/{raw_date[2:4]}/{raw_date[4:]}"
-
-        try:
-            date = datetime.strptime(raw_date, "%d/%m/%Y")
-        except ValueError:
+        day = parse_day(self.date.value)
+        if day is None:
             await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
             return
 
-        data = load_data(INCOME_FILE)
-        entries = data.get(self.user_id, [])
-        for e in entries:
-            if float(e["amount"]) == self.old_amount and e["date"] == self.old_date:
-                e["amount"] = new_amount
-                e["date"] = date.strftime("%d/%m/%Y")
-                break
-        data[self.user_id] = entries
-        save_data(INCOME_FILE, data)
+        await store.update(INCOME_FILE, self.user_id, self.entry_id, {
+            "amount": new_amount,
+            "day": day
+        })
         await interaction.response.send_message("✅ Прибуток оновлено.", ephemeral=True)
 
 # Деталізація по категоріях витрат
 class ExpenseCategorySelectForDetail(View):
-    def __init__(self, user_id):
+    def __init__(self, user_id, categories):
         super().__init__(timeout=60)
-        self.add_item(ExpenseCategoryDetailDropdown(user_id))
+        self.add_item(ExpenseCategoryDetailDropdown(user_id, categories))
 
 class ExpenseCategoryDetailDropdown(Select):
-    def __init__(self, user_id):
+    def __init__(self, user_id, categories):
         self.user_id = user_id
-        data = load_data(EXPENSES_FILE)
-        expenses = data.get(self.user_id, [])
-        categories = sorted(set(e.get("category", "Без категорії") for e in expenses))
         options = [SelectOption(label=cat) for cat in categories]
         super().__init__(placeholder="Оберіть категорію для деталей", options=options)
 
     async def callback(self, interaction: Interaction):
         selected = self.values[0]
-        data = load_data(EXPENSES_FILE)
-        expenses = [e for e in data.get(self.user_id, []) if e.get("category") == selected]
+        expenses = await store.find(EXPENSES_FILE, self.user_id, category=selected)  # уже впорядковані за датою
 
         if not expenses:
             await interaction.response.send_message("📭 Витрат для цієї категорії немає.", ephemeral=True)
             return
 
-        try:
-            expenses.sort(key=lambda x: datetime.strptime(x["date"], "%d/%m/%Y"))
-        except Exception:
-            pass
-
         details = "\n".join(f"{e['amount']} грн — {e['date']}" for e in expenses)
         options = [
-            SelectOption(label=f"{e['amount']} грн — {e['date']}", value=f"{e['amount']}#{e['date']}#{i}")
-            for i, e in enumerate(expenses)
+            SelectOption(label=f"{e['amount']} грн — {e['date']}", value=e["id"])
+            for e in expenses
         ]
         await interaction.response.defer()
         await interaction.channel.send(
@@ -186,43 +152,40 @@ class EditExpenseEntryDropdown(Select):
         super().__init__(placeholder="Оберіть запис", options=options)
 
     async def callback(self, interaction: Interaction):
-        amount, date, _ = self.values[0].split("#")
+        entry = await store.get_entry(EXPENSES_FILE, self.user_id, self.values[0])
+        if entry is None:
+            await interaction.response.send_message("❌ Витрату не знайдено.", ephemeral=True)
+            return
         await interaction.response.defer()
         await interaction.channel.send(
-            f"Що бажаєте зробити з витратою {amount} грн — {date}?",
-            view=ExpenseEditDeleteView(self.user_id, float(amount), date)
+            f"Що бажаєте зробити з витратою {entry['amount']} грн — {entry['date']}?",
+            view=ExpenseEditDeleteView(self.user_id, entry)
         )
 
 # Кнопки: редагувати або видалити
 class ExpenseEditDeleteView(View):
-    def __init__(self, user_id, old_amount, old_date):
+    def __init__(self, user_id, entry):
         super().__init__(timeout=60)
         self.user_id = user_id
-        self.old_amount = old_amount
-        self.old_date = old_date
+        self.entry = entry
 
     @discord.ui.button(label="✏️ Редагувати", style=ButtonStyle.primary)
     async def edit(self, interaction: Interaction, button: Button):
-        await interaction.response.send_modal(EditExpenseModal(self.user_id, self.old_amount, self.old_date))
+        await interaction.response.send_modal(EditExpenseModal(self.user_id, self.entry))
 
     @discord.ui.button(label="🗑 Видалити", style=ButtonStyle.danger)
     async def delete(self, interaction: Interaction, button: Button):
-        data = load_data(EXPENSES_FILE)
-        expenses = data.get(self.user_id, [])
-        updated = [e for e in expenses if not (float(e["amount"]) == self.old_amount and e["date"] == self.old_date)]
-        data[self.user_id] = updated
-        save_data(EXPENSES_FILE, data)
+        await store.delete(EXPENSES_FILE, self.user_id, self.entry["id"])
         await interaction.response.send_message("🗑 Витрату видалено.", ephemeral=True)
 
 # Модальне вікно редагування
 class EditExpenseModal(Modal, title="Редагування витрати"):
-    def __init__(self, user_id, old_amount, old_date):
+    def __init__(self, user_id, entry):
         super().__init__()
         self.user_id = user_id
-        self.old_amount = old_amount
-        self.old_date = old_date
-        self.amount = TextInput(label="Нова сума", default=str(old_amount))
-        self.date = TextInput(label="Нова дата (ДД/ММ/РРРР або 01042025)", default=old_date)
+        self.entry_id = entry["id"]
+        self.amount = TextInput(label="Нова сума", default=str(entry["amount"]))
+        self.date = TextInput(label="Нова дата (ДД/ММ/РРРР або 01042025)", default=entry["date"])
         self.add_item(self.amount)
         self.add_item(self.date)
 
@@ -233,23 +196,13 @@ class EditExpenseModal(Modal, title="Редагування витрати"):
             await interaction.response.send_message("❌ Невірна сума.", ephemeral=True)
             return
 
-        raw_date = self.date.value.strip()
-        if raw_date.isdigit() and len(raw_date) == 8:
-            raw_date = f"{raw_date[:2]}/{raw_date[2:4]}/{raw_date[4:]}"
-
-        try:
-            date = datetime.strptime(raw_date, "%d/%m/%Y")
-        except ValueError:
+        day = parse_day(self.date.value)
+        if day is None:
             await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
             return
 
-        data = load_data(EXPENSES_FILE)
-        entries = data.get(self.user_id, [])
-        for e in entries:
-            if float(e["amount"]) == self.old_amount and e["date"] == self.old_date:
-                e["amount"] = new_amount
-                e["date"] = date.strftime("%d/%m/%Y")
-                break
-        data[self.user_id] = entries
-        save_data(EXPENSES_FILE, data)
+        await store.update(EXPENSES_FILE, self.user_id, self.entry_id, {
+            "amount": new_amount,
+            "day": day
+        })
         await interaction.response.send_message("✅ Витрату оновлено.", ephemeral=True)
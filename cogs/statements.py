@@ -0,0 +1,189 @@
+import asyncio
+import os
+from datetime import date, timedelta
+from io import BytesIO
+
+import discord
+from discord.ext import commands, tasks
+
+from config import STATEMENT_RENDERS, STATEMENT_UPLOADS, STATEMENT_WINDOW_DAYS
+from utils import render_pool
+from utils.async_store import store
+from utils.helpers import DATA_PATH, SETTINGS_FILE
+from utils.pdf_render import overall_pdf
+from utils.pdf_report import overall_report_data
+from utils.summary import load_summary
+
+STATEMENTS_DIR = os.path.join(DATA_PATH, "statements")
+
+
+def statement_period(today):
+    # виписка 1-го числа — за попередній календарний місяць
+    last = today.replace(day=1) - timedelta(days=1)
+    return last.replace(day=1), last
+
+
+# --- прогрес: data/statements/РРРР-ММ.log, рядок на користувача ---
+# Рядок дописується одразу після надсилання, тож перезапуск посеред розсилки
+# продовжує з того ж місця і не шле виписку вдруге. Невдалі (failed) не записуються:
+# поки такі є, місяць не закривається і наступний прохід планувальника пробує їх знову.
+class Progress:
+    def __init__(self, period_start):
+        os.makedirs(STATEMENTS_DIR, exist_ok=True)
+        self.path = os.path.join(STATEMENTS_DIR, f"{period_start.year}-{period_start.month:02d}.log")
+        self.handled = set()
+        self.complete = False
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if parts == ["done"]:
+                        self.complete = True
+                    elif parts:
+                        self.handled.add(parts[0])
+        self._file = None
+
+    def mark(self, user_id, status):
+        if self._file is None or self._file.closed:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(f"{user_id} {status}\n")
+        self._file.flush()
+        self.handled.add(user_id)
+
+    def finish(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("done\n")
+        self.complete = True
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Statements(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.running = False
+        self.stats = {"sent": 0, "skipped": 0, "closed": 0, "failed": 0}
+        self.scheduler.start()
+
+    async def cog_unload(self):
+        self.scheduler.cancel()
+
+    # раз на пів години: 1-го числа (або кількома днями пізніше, якщо бот не працював) — розсилка
+    @tasks.loop(minutes=30)
+    async def scheduler(self):
+        today = date.today()
+        if self.running or today.day > STATEMENT_WINDOW_DAYS:
+            return
+        period = statement_period(today)
+        progress = Progress(period[0])
+        if progress.complete:
+            return
+        self.running = True
+        try:
+            await self.run_batch(period, progress)
+        except Exception as e:
+            # tasks.loop зупиняється на першому ж винятку — розсилка продовжиться наступним проходом
+            print(f"[!] Розсилка виписок перервалась: {e}")
+        finally:
+            progress.close()
+            self.running = False
+
+    @scheduler.before_loop
+    async def before_scheduler(self):
+        await self.bot.wait_until_ready()
+
+    async def subscribers(self):
+        settings = await store.iter_users(SETTINGS_FILE)
+        return sorted(user_id for user_id, value in settings if (value or {}).get("monthly_statement"))
+
+    async def run_batch(self, period, progress):
+        date_from, date_to = period
+        label = f"{date_from.month:02d}/{date_from.year}"
+        self.stats = {"sent": 0, "skipped": 0, "closed": 0, "failed": 0}
+        pending = [user_id for user_id in await self.subscribers() if user_id not in progress.handled]
+        print(f"[i] Виписки за {label}: {len(pending)} користувачів (вже оброблено {len(progress.handled)})")
+
+        # малювання і надсилання — окремі етапи з власними обмеженнями;
+        # обмежена черга між ними тримає в пам'яті лише кілька готових PDF
+        users = asyncio.Queue()
+        for user_id in pending:
+            users.put_nowait(user_id)
+        ready = asyncio.Queue(maxsize=STATEMENT_UPLOADS * 2)
+
+        async def render():
+            while True:
+                try:
+                    user_id = users.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                # помилка одного користувача не зупиняє розсилку для інших
+                try:
+                    # разове читання: стани тисяч підписників не лишаються в кеші бекенду
+                    summary = await load_summary(user_id, date_from, date_to, cache=False)
+                    if not summary.income and not summary.expenses:
+                        self.record(progress, user_id, "skipped")
+                        continue
+                    report = overall_report_data(summary, title=f"Виписка за {label}")
+                    pdf = await render_pool.run(overall_pdf, report)
+                except Exception as e:
+                    print(f"[!] Виписка для {user_id} не зібралась: {e}")
+                    self.record(progress, user_id, "failed")
+                    continue
+                await ready.put((user_id, pdf))
+
+        async def upload():
+            while True:
+                item = await ready.get()
+                if item is None:
+                    return
+                user_id, pdf = item
+                try:
+                    status = await self.send_statement(user_id, pdf, label)
+                except Exception as e:
+                    print(f"[!] Не вдалося надіслати виписку {user_id}: {e}")
+                    status = "failed"
+                self.record(progress, user_id, status)
+
+        uploaders = [asyncio.create_task(upload()) for _ in range(STATEMENT_UPLOADS)]
+        try:
+            await asyncio.gather(*(render() for _ in range(STATEMENT_RENDERS)))
+        finally:
+            for _ in uploaders:
+                await ready.put(None)
+            await asyncio.gather(*uploaders)
+        if self.stats["failed"]:
+            print(f"[!] Виписки за {label}: {self.stats}, невдалі — повтор наступним проходом")
+        else:
+            progress.finish()
+            print(f"[✓] Виписки за {label}: {self.stats}")
+
+    def record(self, progress, user_id, status):
+        self.stats[status] += 1
+        if status == "failed":
+            return
+        try:
+            progress.mark(user_id, status)
+        except OSError as e:
+            print(f"[!] Не вдалося записати прогрес виписок: {e}")
+
+    async def send_statement(self, user_id, pdf, label):
+        try:
+            user = self.bot.get_user(int(user_id)) or await self.bot.fetch_user(int(user_id))
+            await user.send(
+                f"📬 Ваша фінансова виписка за {label}.",
+                file=discord.File(BytesIO(pdf), filename=f"statement_{label.replace('/', '_')}.pdf")
+            )
+            return "sent"
+        except (discord.Forbidden, discord.NotFound):
+            return "closed"  # закриті приватні повідомлення або користувача немає — повтор не допоможе
+        except discord.HTTPException as e:
+            print(f"[!] Не вдалося надіслати виписку {user_id}: {e}")
+            return "failed"
+
+
+async def setup(bot):
+    await bot.add_cog(Statements(bot))
@@ -0,0 +1,29 @@
+import asyncio
+from discord.ext import commands, tasks
+from utils.helpers import compact_storage
+from utils.async_store import store
+from utils import render_pool
+
+
+class Storage(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.compactor.start()
+
+    async def cog_unload(self):
+        self.compactor.cancel()
+        render_pool.shutdown()
+        # бот зупиняється: дописуємо відкладені зміни на диск
+        await store.close()
+        await asyncio.to_thread(compact_storage)
+
+    # переносить журнали доданих записів у знімки data/<ledger>/<user_id>.json
+    @tasks.loop(minutes=5)
+    async def compactor(self):
+        compacted = await asyncio.to_thread(compact_storage)
+        if compacted:
+            print(f"[✓] Ущільнено журнали для {compacted} користувачів")
+
+
+async def setup(bot):
+    await bot.add_cog(Storage(bot))
@@ -35,10 +35,10 @@ class MenuView(View):
     @discord.ui.button(label="⚙️ Категорії", style=discord.ButtonStyle.secondary)
     async def manage_categories(self, interaction: discord.Interaction, button: Button):
         from cogs.ui.base_category import BaseCategoryManagerView
-        CategoryManagerView = lambda user_id: BaseCategoryManagerView(user_id, is_income=False)
+        CategoryManagerView = lambda user_id: BaseCategoryManagerView.load(user_id, is_income=False)
 
         await interaction.response.send_message(
             "🔧 Редагування категорій:",
             ephemeral=True,
-            view=CategoryManagerView(self.user_id)
+            view=await CategoryManagerView(self.user_id)
         )
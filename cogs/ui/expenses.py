@@ -1,10 +1,13 @@
 import discord
 from discord.ui import Modal, TextInput, Select, View, Button
-from utils.helpers import load_data, save_data, EXPENSES_FILE
-from datetime import datetime
+from utils.helpers import EXPENSES_FILE, SETTINGS_FILE
+from utils.async_store import store
+from datetime import date
+from utils.dates import parse_day, format_day, today
 from io import BytesIO
 from discord import File
-from cogs.charts import draw_donut_chart
+from cogs import charts
+from utils.summary import load_summary
 from cogs.report import ExpenseCategorySelectForDetail  # 🔺 переконайся, що імпорт є
 
 
@@ -27,39 +30,31 @@ class ExpenseModal(Modal, title="Введення витрати"):
             return
 
         raw_date = self.date.value.strip()
-        if not raw_date:
-            date = datetime.now()
-        else:
-            if raw_date.isdigit() and len(raw_date) == 8:
-                raw_date = f"{raw_date[:2]}/{raw_date[2:4]}/{raw_date[4:]}"
-            try:
-                date = datetime.strptime(raw_date, "%d/%m/%Y")
-            except ValueError:
-                await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
-                return
-
-        data = load_data(EXPENSES_FILE)
-        user_expenses = data.get(self.user_id, [])
-        user_expenses.append({"category": self.category, "amount": amount_value, "date": date.strftime("%d/%m/%Y")})
-        data[self.user_id] = user_expenses
-        save_data(EXPENSES_FILE, data)
-
-        settings = load_data("data/settings.json")
-        user_settings = settings.get(self.user_id, {})
+        day = parse_day(raw_date) if raw_date else today()
+        if day is None:
+            await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
+            return
+
+        await store.append(EXPENSES_FILE, self.user_id, {"category": self.category, "amount": amount_value, "day": day})
+
+        user_settings = await store.get(SETTINGS_FILE, self.user_id, {})
         daily_limit = user_settings.get("daily_limit", None)
 
         await interaction.response.send_message(
-            f"✅ Збережено {amount_value:.2f} грн в категорії **{self.category}** на {date.strftime('%d/%m/%Y')}.",
+            f"✅ Збережено {amount_value:.2f} грн в категорії **{self.category}** на {format_day(day)}.",
             ephemeral=True
         )
 
         if daily_limit is not None:
-            today = datetime.now().strftime("%d/%m/%Y")
-            today_total = sum(
-                float(e["amount"]) for e in user_expenses if e["date"] == today
-            )
-            if today_total > daily_limit:
-                await interaction.followup.send("⚠️ **УВАГА!! Ви використали встановлений ліміт, бережіть свої кошти 😉**")
+            # ліміт перевіряється для дня самої витрати, сума за день береться з поточних підсумків
+            day_total = await store.day_total(EXPENSES_FILE, self.user_id, date.fromordinal(day))
+            day_label = "" if day == today() else f" за {format_day(day)}"
+            if day_total > daily_limit:
+                await interaction.followup.send(f"⚠️ **УВАГА!! Ви використали встановлений ліміт{day_label}, бережіть свої кошти 😉**")
+            elif day_total - amount_value < daily_limit * 0.8 <= day_total:
+                await interaction.followup.send(
+                    f"🔔 Ви використали 80% денного ліміту{day_label}: {day_total:.2f} з {daily_limit:.2f} грн."
+                )
 
 class SetLimitModal(Modal, title="Встановити ліміт витрат"):
     def __init__(self, user_id):
@@ -75,11 +70,9 @@ class SetLimitModal(Modal, title="Встановити ліміт витрат")
             await interaction.response.send_message("❌ Введено неправильне число.", ephemeral=True)
             return
 
-        settings = load_data("data/settings.json")
-        user_settings = settings.get(self.user_id, {})
+        user_settings = await store.get(SETTINGS_FILE, self.user_id, {})
         user_settings["daily_limit"] = limit
-        settings[self.user_id] = user_settings
-        save_data("data/settings.json", settings)
+        await store.set(SETTINGS_FILE, self.user_id, user_settings)
 
         await interaction.response.send_message(f"✅ Ліміт витрат встановлено: {limit:.2f} грн/день.", ephemeral=True)
 
@@ -100,18 +93,12 @@ class CategorySelect(Select):
 
 
 async def show_expense_report(interaction: discord.Interaction, user_id: str):
-    data = load_data(EXPENSES_FILE)
-    expenses = data.get(str(user_id), [])
-    if not expenses:
+    summary = await load_summary(user_id, income=False)
+    if not summary.expenses:
         await interaction.response.send_message("📭 Немає витрат для звіту.", ephemeral=True)
         return
 
-    summary = {}
-    for e in expenses:
-        cat = e["category"]
-        summary[cat] = summary.get(cat, 0) + float(e["amount"])
-
-    lines = [f"**{cat}**: {amount:.2f} грн" for cat, amount in summary.items()]
+    lines = [f"**{cat}**: {amount:.2f} грн" for cat, amount in summary.expenses.items()]
     text = "📊 **Звіт про витрати:**\n" + "\n".join(lines)
 
     await interaction.response.defer(ephemeral=True)  # ✅ дозволяє кілька followup-повідомлень
@@ -120,21 +107,9 @@ async def show_expense_report(interaction: discord.Interaction, user_id: str):
     # ⬇️ Додаємо логіку редагування з report.py
     await interaction.followup.send(
         "🔧 Оберіть категорію, щоб переглянути всі записи та редагувати:",
-        view=ExpenseCategorySelectForDetail(user_id)
+        view=ExpenseCategorySelectForDetail(user_id, summary.expense_categories())
     )
 
 
 async def show_expense_chart(interaction: discord.Interaction, user_id: str):
-    data = load_data(EXPENSES_FILE)
-    expenses = data.get(str(user_id), [])
-    if not expenses:
-        await interaction.response.send_message("📭 Немає даних для діаграми.", ephemeral=True)
-        return
-
-    summary = {}
-    for e in expenses:
-        cat = e["category"]
-        summary[cat] = summary.get(cat, 0) + float(e["amount"])
-
-    await draw_donut_chart(interaction, summary, "Розподіл витрат")
-
+    await charts.show_expense_chart(interaction, user_id)
@@ -1,8 +1,213 @@
-
+import calendar
 import discord
-from discord.ui import View, Select
-from datetime import datetime
-from utils.helpers import load_data, EXPENSES_FILE, INCOME_FILE, AUTO_INCOME_FILE
+from discord.ui import View, Select, Modal, TextInput
+from datetime import datetime, timedelta
+from utils.dates import parse_date
+from utils.summary import load_summary, load_trend, month_label
+from cogs.charts import show_series_chart
+
+
+def month_bounds(day):
+    return day.replace(day=1), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def period_bounds(period_label: str, today):
+    if period_label == "Цей тиждень":
+        start = today - timedelta(days=today.weekday())
+        return start, start + timedelta(days=6)
+    if period_label == "Цей місяць":
+        return month_bounds(today)
+    return today, today
+
+
+def previous_period(date_from, date_to):
+    # календарний місяць порівнюємо з попереднім місяцем, решту — з відрізком такої ж довжини перед ним;
+    # None — попередній відрізок почався б раніше за 01/01/0001
+    try:
+        if date_from == month_bounds(date_from)[0] and date_to == month_bounds(date_from)[1]:
+            return month_bounds(date_from - timedelta(days=1))
+        length = date_to - date_from + timedelta(days=1)
+        return date_from - length, date_to - length
+    except OverflowError:
+        return None
+
+
+def change_text(current, previous):
+    if previous == 0:
+        return "—" if current == 0 else "нове"
+    return f"{(current - previous) / abs(previous) * 100:+.1f}%"
+
+
+async def period_totals(user_id, date_from, date_to):
+    summary = await load_summary(user_id, date_from, date_to)
+    return summary.total_income, summary.total_expenses
+
+
+async def send_period_report(interaction: discord.Interaction, user_id: str, period_label: str, date_from, date_to):
+    total_income, total_expense = await period_totals(user_id, date_from, date_to)
+    balance = total_income - total_expense
+
+    report = (
+        f"📋 **Загальний звіт за період: {period_label}**\n"
+        f"🗓 {date_from.strftime('%d/%m/%Y')} — {date_to.strftime('%d/%m/%Y')}\n\n"
+        f"💰 Прибутків: {total_income:.2f} грн\n"
+        f"💸 Витрат: {total_expense:.2f} грн\n"
+        f"📊 Баланс: {balance:.2f} грн"
+    )
+
+    previous = previous_period(date_from, date_to)
+    if previous is not None:
+        prev_from, prev_to = previous
+        prev_income, prev_expense = await period_totals(user_id, prev_from, prev_to)
+        prev_balance = prev_income - prev_expense
+        report += (
+            f"\n\n↩️ **Попередній період** ({prev_from.strftime('%d/%m/%Y')} — {prev_to.strftime('%d/%m/%Y')}):\n"
+            f"💰 {prev_income:.2f} грн ({change_text(total_income, prev_income)})\n"
+            f"💸 {prev_expense:.2f} грн ({change_text(total_expense, prev_expense)})\n"
+            f"📊 {prev_balance:.2f} грн"
+        )
+
+    await interaction.response.send_message(content=report, ephemeral=True)
+
+
+# --- Довільний період ---
+class CustomPeriodModal(Modal, title="Звіт за період"):
+    def __init__(self, user_id: str):
+        super().__init__()
+        self.user_id = str(user_id)
+        self.date_from = TextInput(label="Від (ДД/ММ/РРРР або 01042025)", placeholder="ДД/ММ/РРРР", required=True)
+        self.date_to = TextInput(label="До (ДД/ММ/РРРР, порожньо — сьогодні)", placeholder="ДД/ММ/РРРР", required=False)
+        self.add_item(self.date_from)
+        self.add_item(self.date_to)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        date_from = parse_date(self.date_from.value)
+        date_to = parse_date(self.date_to.value) if self.date_to.value.strip() else datetime.now().date()
+        if date_from is None or date_to is None:
+            await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
+            return
+        if date_from > date_to:
+            date_from, date_to = date_to, date_from
+
+        await send_period_report(interaction, self.user_id, "Свій період", date_from, date_to)
+
+
+# --- Графік за днями/тижнями ---
+SERIES_STEPS = {"день": "day", "д": "day", "тиждень": "week", "т": "week"}
+SERIES_MAX_YEARS = 10  # довший діапазон обрізається до останніх років (видно в підписі графіка)
+
+
+class SeriesChartModal(Modal, title="Графік прибутків і витрат"):
+    def __init__(self, user_id: str):
+        super().__init__()
+        self.user_id = str(user_id)
+        self.date_from = TextInput(label="Від (ДД/ММ/РРРР або 01042025)", placeholder="ДД/ММ/РРРР", required=True)
+        self.date_to = TextInput(label="До (ДД/ММ/РРРР, порожньо — сьогодні)", placeholder="ДД/ММ/РРРР", required=False)
+        self.step = TextInput(label="Крок: день або тиждень (порожньо — авто)", placeholder="день", required=False)
+        self.add_item(self.date_from)
+        self.add_item(self.date_to)
+        self.add_item(self.step)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        date_from = parse_date(self.date_from.value)
+        date_to = parse_date(self.date_to.value) if self.date_to.value.strip() else datetime.now().date()
+        if date_from is None or date_to is None:
+            await interaction.response.send_message("❌ Невірна дата.", ephemeral=True)
+            return
+        if date_from > date_to:
+            date_from, date_to = date_to, date_from
+        max_span = timedelta(days=round(SERIES_MAX_YEARS * 365.25))
+        if date_to - date_from > max_span:
+            date_from = date_to - max_span
+
+        step = self.step.value.strip().lower()
+        if not step:
+            # до трьох місяців — по днях, довше — по тижнях
+            period = "day" if (date_to - date_from).days <= 92 else "week"
+        elif step in SERIES_STEPS:
+            period = SERIES_STEPS[step]
+        else:
+            await interaction.response.send_message("❌ Крок має бути «день» або «тиждень».", ephemeral=True)
+            return
+
+        await show_series_chart(interaction, self.user_id, date_from, date_to, period)
+
+
+# --- Тренд за роки ---
+TREND_MAX_YEARS = 10  # довший діапазон — сотні повідомлень; показуємо останні роки
+
+
+def trend_messages(rows, limit=1900):
+    lines = []
+    year_income = year_expenses = 0
+    for i, row in enumerate(rows):
+        prev = rows[i - 1] if i else None
+        change = f" (Δ {row.balance - prev.balance:+.2f})" if prev is not None else ""
+        top = f" · топ: {row.top_expense}" if row.top_expense else ""
+        lines.append(
+            f"`{month_label(row.month)}` 💰 {row.income:.2f} · 💸 {row.expenses:.2f} · 📊 {row.balance:.2f}{change}{top}"
+        )
+        year_income += row.income
+        year_expenses += row.expenses
+        if row.month % 12 == 11 or i == len(rows) - 1:
+            lines.append(
+                f"**{row.month // 12} разом:** 💰 {year_income:.2f} · 💸 {year_expenses:.2f} · "
+                f"📊 {year_income - year_expenses:.2f}\n"
+            )
+            year_income = year_expenses = 0
+
+    # повідомлення Discord обмежені 2000 символами
+    messages, current = [], "📈 **Тренд по місяцях** (грн)\n"
+    for line in lines:
+        if len(current) + len(line) + 1 > limit:
+            messages.append(current)
+            current = ""
+        current += line + "\n"
+    messages.append(current)
+    return messages
+
+
+class TrendModal(Modal, title="Тренд за роки"):
+    def __init__(self, user_id: str):
+        super().__init__()
+        self.user_id = str(user_id)
+        self.year_from = TextInput(label="Від року", placeholder="Наприклад: 2023", required=True, max_length=4)
+        self.year_to = TextInput(label="До року (порожньо — поточний)", placeholder="РРРР", required=False, max_length=4)
+        self.add_item(self.year_from)
+        self.add_item(self.year_to)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        today = datetime.now().date()
+        try:
+            year_from = int(self.year_from.value)
+            year_to = int(self.year_to.value) if self.year_to.value.strip() else today.year
+        except ValueError:
+            await interaction.response.send_message("❌ Невірний рік.", ephemeral=True)
+            return
+        if year_from > year_to:
+            year_from, year_to = year_to, year_from
+        if not 1 <= year_from <= today.year:
+            await interaction.response.send_message("❌ Невірний рік.", ephemeral=True)
+            return
+
+        note = ""
+        if year_to - year_from >= TREND_MAX_YEARS:
+            year_from = year_to - TREND_MAX_YEARS + 1
+            note = f"ℹ️ Показано не більше {TREND_MAX_YEARS} років: з {year_from} по {year_to}.\n"
+
+        # місяці після поточного не показуємо
+        last_month = min(year_to * 12 + 11, today.year * 12 + today.month - 1)
+        rows = await load_trend(self.user_id, year_from * 12, last_month)
+        if not rows:
+            await interaction.response.send_message("ℹ️ За цей період немає записів.", ephemeral=True)
+            return
+        messages = trend_messages(rows)
+        messages[0] = note + messages[0]
+
+        await interaction.response.send_message(messages[0], ephemeral=True)
+        for message in messages[1:]:
+            await interaction.followup.send(message, ephemeral=True)
+
 
 # --- Вибір періоду ---
 class OverallReportSelect(Select):
@@ -13,7 +218,10 @@ class OverallReportSelect(Select):
         options = [
             discord.SelectOption(label="Сьогодні", value="day"),
             discord.SelectOption(label="Цей тиждень", value="week"),
-            discord.SelectOption(label="Цей місяць", value="month")
+            discord.SelectOption(label="Цей місяць", value="month"),
+            discord.SelectOption(label="Свій період", value="custom"),
+            discord.SelectOption(label="Тренд", value="trend"),
+            discord.SelectOption(label="Графік", value="series")
         ]
         super().__init__(placeholder="Оберіть період", options=options)
 
@@ -24,6 +232,15 @@ class OverallReportSelect(Select):
             "month": "Цей місяць"
         }
         selected = self.values[0]
+        if selected == "custom":
+            await interaction.response.send_modal(CustomPeriodModal(interaction.user.id))
+            return
+        if selected == "trend":
+            await interaction.response.send_modal(TrendModal(interaction.user.id))
+            return
+        if selected == "series":
+            await interaction.response.send_modal(SeriesChartModal(interaction.user.id))
+            return
         label = label_map.get(selected, "Невідомо")
         await self.on_select_callback(interaction, label)
 
@@ -38,50 +255,5 @@ class OverallReportView(View):
 
     async def on_period_selected(self, interaction: discord.Interaction, period_label: str):
         user_id = str(interaction.user.id)
-        incomes = load_data(INCOME_FILE).get(user_id, [])
-        auto_incomes = load_data(AUTO_INCOME_FILE).get(user_id, [])
-        incomes += auto_incomes
-        expenses = load_data(EXPENSES_FILE).get(user_id, [])
-
-        now = datetime.now()
-        filtered_incomes = []
-        filtered_expenses = []
-
-        for item in incomes:
-            try:
-                item_date = datetime.strptime(item.get("date", ""), "%d/%m/%Y")
-            except Exception:
-                continue
-
-            if period_label == "Сьогодні" and item_date.date() == now.date():
-                filtered_incomes.append(item)
-            elif period_label == "Цей тиждень" and item_date.isocalendar()[1] == now.isocalendar()[1]:
-                filtered_incomes.append(item)
-            elif period_label == "Цей місяць" and item_date.month == now.month and item_date.year == now.year:
-                filtered_incomes.append(item)
-
-        for item in expenses:
-            try:
-                item_date = datetime.strptime(item.get("date", ""), "%d/%m/%Y")
-            except Exception:
-                continue
-
-            if period_label == "Сьогодні" and item_date.date() == now.date():
-                filtered_expenses.append(item)
-            elif period_label == "Цей тиждень" and item_date.isocalendar()[1] == now.isocalendar()[1]:
-                filtered_expenses.append(item)
-            elif period_label == "Цей місяць" and item_date.month == now.month and item_date.year == now.year:
-                filtered_expenses.append(item)
-
-        total_income = sum(float(i.get("amount", 0)) for i in filtered_incomes)
-        total_expense = sum(float(e.get("amount", 0)) for e in filtered_expenses)
-        balance = total_income - total_expense
-
-        report = (
-            f"📋 **Загальний звіт за період: {period_label}**\n\n"
-            f"💰 Прибутків: {total_income:.2f} грн\n"
-            f"💸 Витрат: {total_expense:.2f} грн\n"
-            f"📊 Баланс: {balance:.2f} грн"
-        )
-
-        await interaction.response.send_message(content=report, ephemeral=True)
+        date_from, date_to = period_bounds(period_label, datetime.now().date())
+        await send_period_report(interaction, user_id, period_label, date_from, date_to)
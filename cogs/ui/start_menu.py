@@ -1,6 +1,7 @@
 import discord
 from discord.ui import View, Button
-from utils.helpers import load_data
+from utils.helpers import CATEGORIES_FILE, SETTINGS_FILE
+from utils.async_store import store
 from .expense_menu import MenuView
 from ..income.menu import IncomeMenuView
 from .overall_report import OverallReportView
@@ -37,8 +38,7 @@ class StartView(View):
         key = (interaction.channel.id, interaction.user.id)
         cog = interaction.client.get_cog("UI")
 
-        data = load_data("data/categories.json")
-        categories = data.get(self.user_id, [])
+        categories = await store.get(CATEGORIES_FILE, self.user_id, [])
         await interaction.response.send_message(
             "💸 Меню керування витратами:",
             ephemeral=True,
@@ -66,6 +66,23 @@ class StartView(View):
         from utils.pdf_report import send_overall_pdf_report
         await send_overall_pdf_report(interaction)
 
+    @discord.ui.button(label="📒 PDF журнал", style=discord.ButtonStyle.secondary)
+    async def ledger_pdf_report(self, interaction: discord.Interaction, button: Button):
+        from utils.pdf_report import send_ledger_pdf_report
+        await send_ledger_pdf_report(interaction)
+
+    @discord.ui.button(label="📬 Виписка щомісяця", style=discord.ButtonStyle.secondary)
+    async def monthly_statement(self, interaction: discord.Interaction, button: Button):
+        user_id = str(interaction.user.id)
+        user_settings = await store.get(SETTINGS_FILE, user_id, {})
+        enabled = not user_settings.get("monthly_statement", False)
+        user_settings["monthly_statement"] = enabled
+        await store.set(SETTINGS_FILE, user_id, user_settings)
+        await interaction.response.send_message(
+            "📬 Щомісячну PDF-виписку увімкнено: 1-го числа вона прийде в приватні повідомлення."
+            if enabled else "📭 Щомісячну виписку вимкнено.",
+            ephemeral=True
+        )
 
 
     @discord.ui.button(label="❓", style=discord.ButtonStyle.secondary)
@@ -79,6 +96,8 @@ class StartView(View):
                 "📈 Прибутки — додавання та перегляд доходів.\n"
                 "💸 Витрати — додавання та перегляд витрат.\n"
                 "📋 Загальний звіт — перегляд балансу.\n"
+                "📒 PDF журнал — усі операції за датами з підсумками по місяцях.\n"
+                "📬 Виписка щомісяця — PDF за минулий місяць у приватні повідомлення.\n"
                 "ℹ️ Усі дії через кнопки та вікна!"
             ),
             ephemeral=True
@@ -1,7 +1,8 @@
 import discord
 from discord.ext import commands
 from discord.ui import Modal, TextInput
-from utils.helpers import load_data, save_data, SETTINGS_FILE
+from utils.helpers import SETTINGS_FILE
+from utils.async_store import store
 from .start_menu import StartView
 
 
@@ -43,9 +44,9 @@ class SetLimitModal(Modal, title="Встановити денний ліміт")
             await interaction.response.send_message("❌ Невірне значення ліміту.", ephemeral=True)
             return
 
-        settings = load_data(SETTINGS_FILE)
-        settings.setdefault(self.user_id, {})["daily_limit"] = value
-        save_data(SETTINGS_FILE, settings)
+        user_settings = await store.get(SETTINGS_FILE, self.user_id, {})
+        user_settings["daily_limit"] = value
+        await store.set(SETTINGS_FILE, self.user_id, user_settings)
 
         await interaction.response.send_message(f"✅ Ліміт {value:.2f} грн встановлено.", ephemeral=True)
 
@@ -3,3 +3,38 @@ from dotenv import load_dotenv
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
+
+# "json" (файли в data/) або "sqlite" (data/finance.db)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").strip().lower()
+
+# вікно (секунди), за яке записи в той самий файл об'єднуються в один запис на диск
+STORAGE_FLUSH_DELAY = float(os.getenv("STORAGE_FLUSH_DELAY", "0.5"))
+
+# з якої кількості записів агрегації рахуються через NumPy (якщо він встановлений)
+VECTOR_MIN_ROWS = int(os.getenv("VECTOR_MIN_ROWS", "5000"))
+
+# скільки байтів готових PNG діаграм тримати в пам'яті
+CHART_CACHE_BYTES = int(os.getenv("CHART_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# кількість процесів для малювання діаграм (і скільки малюється одночасно)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+
+# чим малювати кругові діаграми: "matplotlib" або "native" (без залежностей, простіший вигляд)
+CHART_RENDERER = os.getenv("CHART_RENDERER", "matplotlib").strip().lower()
+
+# скільки сторінок у одному файлі PDF-журналу і скільки байтів вкладень в одному повідомленні
+# (ліміт Discord без бустів — 10 МБ, тримаємо запас)
+LEDGER_PAGES_PER_PART = int(os.getenv("LEDGER_PAGES_PER_PART", "200"))
+DISCORD_UPLOAD_LIMIT = int(os.getenv("DISCORD_UPLOAD_LIMIT", str(8 * 1024 * 1024)))
+
+# щомісячні PDF-виписки: скільки з них малюється одночасно (решта пулу — для кнопок),
+# скільки повідомлень надсилається паралельно і скільки днів від 1-го числа ще можна дослати
+STATEMENT_RENDERS = int(os.getenv("STATEMENT_RENDERS", "1"))
+STATEMENT_UPLOADS = int(os.getenv("STATEMENT_UPLOADS", "4"))
+STATEMENT_WINDOW_DAYS = int(os.getenv("STATEMENT_WINDOW_DAYS", "3"))
+
+# сповіщення про автоматичні записи: скільки надсилається паралельно, не більше скількох
+# повідомлень на секунду і скільки може чекати в черзі
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "4"))
+NOTIFY_RATE = float(os.getenv("NOTIFY_RATE", "5"))
+NOTIFY_QUEUE = int(os.getenv("NOTIFY_QUEUE", "1000"))
@@ -0,0 +1,275 @@
+import asyncio
+
+from config import STORAGE_FLUSH_DELAY
+from utils.helpers import get_backend, file_key, new_entry_id, apply_ops, LEDGER_FILES
+from utils.ledger import Ledger, entry_day, month_key
+
+_UNSET = object()
+
+
+class _Pending:
+    # незаписані зміни одного користувача: нове значення (set) і зміни записів після нього
+    __slots__ = ("value", "ops")
+
+    def __init__(self):
+        self.value = _UNSET
+        self.ops = []
+
+    def merge(self, newer):
+        if newer.value is not _UNSET:
+            return newer
+        self.ops.extend(newer.ops)
+        return self
+
+    def apply(self, current):
+        value = current if self.value is _UNSET else self.value
+        if not self.ops:
+            return value
+        by_id = {e["id"]: e for e in value or []}
+        return list(apply_ops(by_id, self.ops).values())
+
+    def added(self):
+        # нові записи, якщо в черзі лише додавання; None — є зміни чи видалення (потрібні старі значення)
+        if self.value is not _UNSET or any(op[0] != "add" for op in self.ops):
+            return None
+        return [op[1] for op in self.ops]
+
+    def apply_to_ledger(self, ledger):
+        if self.value is not _UNSET:
+            ledger = Ledger.from_entries(self.value or [])
+        return ledger.apply_ops(self.ops)
+
+
+# Асинхронний доступ до сховища: диск і SQLite працюють у потоках,
+# а записи в той самий файл за flush_delay секунд об'єднуються в один.
+class AsyncStore:
+    def __init__(self, flush_delay=STORAGE_FLUSH_DELAY):
+        self.flush_delay = flush_delay
+        self._pending = {}  # ключ файлу -> {user_id: _Pending}
+        self._paths = {}
+        self._locks = {}
+        self._timers = {}
+        self._versions = {}  # (ключ файлу, user_id) -> лічильник записів, для кешів похідних даних
+
+    def _key(self, file_path):
+        key = file_key(file_path)
+        self._paths.setdefault(key, file_path)
+        return key
+
+    def _lock(self, key):
+        return self._locks.setdefault(key, asyncio.Lock())
+
+    # --- читання (бачать ще не записані зміни) ---
+    async def get(self, file_path, user_id, default=None):
+        key = self._key(file_path)
+        user_id = str(user_id)
+        if key in LEDGER_FILES and user_id in self._pending.get(key, {}):
+            # незаписані зміни записів накладаються через Ledger, щоб "date" і "day" лишались узгодженими
+            ledger = await self.ledger(file_path, user_id)
+            return ledger.to_dicts() if len(ledger) else default
+        async with self._lock(key):  # чекаємо запис, що вже виконується
+            value = await asyncio.to_thread(get_backend().get_user_data, file_path, user_id, None)
+            pending = self._pending.get(key, {}).get(user_id)
+            if pending is not None:
+                value = pending.apply(value)
+        return default if value is None else value
+
+    async def find(self, file_path, user_id, category=None, date_from=None, date_to=None):
+        key = self._key(file_path)
+        if str(user_id) in self._pending.get(key, {}):
+            return (await self.ledger(file_path, user_id)).find(category, date_from, date_to)
+        async with self._lock(key):
+            return await asyncio.to_thread(
+                get_backend().find_entries, file_path, str(user_id), category, date_from, date_to
+            )
+
+    async def ledger(self, file_path, user_id):
+        # колонкове представлення витрат/прибутків користувача (копія, її можна змінювати)
+        key = self._key(file_path)
+        user_id = str(user_id)
+        async with self._lock(key):
+            ledger = await asyncio.to_thread(get_backend().get_ledger, file_path, user_id)
+            pending = self._pending.get(key, {}).get(user_id)
+            if pending is not None:
+                ledger = pending.apply_to_ledger(ledger)
+        return ledger
+
+    async def _from_totals(self, file_path, user_id, read, *args):
+        # вузький запит до поточних підсумків бекенду (O(категорій) чи O(днів), без копії)
+        # + ще не записані додавання; черга зі змінами чи видаленнями спершу скидається на диск
+        key = self._key(file_path)
+        user_id = str(user_id)
+        while True:
+            pending = self._pending.get(key, {}).get(user_id)
+            if pending is not None and pending.added() is None:
+                await self.flush(file_path)
+            async with self._lock(key):
+                result = await asyncio.to_thread(read, file_path, user_id, *args)
+                pending = self._pending.get(key, {}).get(user_id)
+                added = [] if pending is None else pending.added()
+            if added is not None:
+                return result, added
+
+    async def day_total(self, file_path, user_id, day):
+        # сума за один день (day — date): O(1) з підсумків, незалежно від довжини історії
+        total, added = await self._from_totals(file_path, user_id, get_backend().day_total, day)
+        ordinal = day.toordinal()
+        return total + sum(float(e.get("amount", 0)) for e in added if entry_day(e)[0] == ordinal)
+
+    async def sum_by_category(self, file_path, user_id, date_from=None, date_to=None, cache=True):
+        # cache=False — разове читання за період: бекенд не тримає стан користувача в кеші
+        if date_from is None and date_to is None:
+            sums, added = await self._from_totals(file_path, user_id, get_backend().category_totals)
+            for e in added:
+                category = e.get("category", "Без категорії")
+                sums[category] = sums.get(category, 0.0) + float(e.get("amount", 0))
+            return sums
+        key = self._key(file_path)
+        if str(user_id) in self._pending.get(key, {}):
+            return (await self.ledger(file_path, user_id)).sum_by_category(date_from, date_to)
+        async with self._lock(key):
+            return await asyncio.to_thread(
+                get_backend().sum_by_category, file_path, str(user_id), date_from, date_to, cache
+            )
+
+    async def monthly_rollups(self, file_path, user_id, first_month, last_month):
+        # {місяць: {категорія: сума}}; місяць — рік * 12 + місяць - 1
+        rollups, added = await self._from_totals(
+            file_path, user_id, get_backend().monthly_rollups, first_month, last_month
+        )
+        for e in added:
+            day = entry_day(e)[0]
+            if day and first_month <= month_key(day) <= last_month:
+                month = rollups.setdefault(month_key(day), {})
+                category = e.get("category", "Без категорії")
+                month[category] = month.get(category, 0.0) + float(e.get("amount", 0))
+        return rollups
+
+    async def daily_totals(self, file_path, user_id, date_from, date_to):
+        # [(ординал дня, сума)] лише для днів із записами, за зростанням
+        daily, added = await self._from_totals(file_path, user_id, get_backend().daily_totals, date_from, date_to)
+        if not added:
+            return daily
+        sums = dict(daily)
+        first, last = date_from.toordinal(), date_to.toordinal()
+        for e in added:
+            day = entry_day(e)[0]
+            if day and first <= day <= last:
+                sums[day] = sums.get(day, 0.0) + float(e.get("amount", 0))
+        return sorted(sums.items())
+
+    async def get_entry(self, file_path, user_id, entry_id):
+        key = self._key(file_path)
+        if str(user_id) in self._pending.get(key, {}):
+            entries = await self.get(file_path, user_id, [])
+            return next((e for e in entries if e["id"] == entry_id), None)
+        async with self._lock(key):
+            return await asyncio.to_thread(get_backend().get_entry, file_path, str(user_id), entry_id)
+
+    def version(self, file_path, user_id):
+        # змінюється з кожним записом користувача в цей файл (ще до скидання на диск)
+        return self._versions.get((self._key(file_path), str(user_id)), 0)
+
+    async def iter_users(self, file_path):
+        await self.flush(file_path)
+        async with self._lock(self._key(file_path)):
+            return await asyncio.to_thread(get_backend().iter_users, file_path)
+
+    # --- запис ---
+    async def set(self, file_path, user_id, value):
+        pending = _Pending()
+        pending.value = value
+        await self._queue(file_path, str(user_id), pending)
+
+    async def append(self, file_path, user_id, entry):
+        entry.setdefault("id", new_entry_id())
+        await self._ops(file_path, user_id, ("add", entry))
+        return entry["id"]
+
+    async def append_many(self, file_path, user_id, entries):
+        # кілька записів однією зміною: одне дописування в журнал
+        for entry in entries:
+            entry.setdefault("id", new_entry_id())
+        await self._ops(file_path, user_id, *(("add", entry) for entry in entries))
+        return [entry["id"] for entry in entries]
+
+    async def update(self, file_path, user_id, entry_id, changes):
+        await self._ops(file_path, user_id, ("update", entry_id, changes))
+
+    async def delete(self, file_path, user_id, entry_id):
+        await self._ops(file_path, user_id, ("delete", entry_id))
+
+    async def _ops(self, file_path, user_id, *ops):
+        pending = _Pending()
+        pending.ops.extend(ops)
+        await self._queue(file_path, str(user_id), pending)
+
+    async def _queue(self, file_path, user_id, pending):
+        key = self._key(file_path)
+        self._versions[(key, user_id)] = self._versions.get((key, user_id), 0) + 1
+        users = self._pending.setdefault(key, {})
+        users[user_id] = users[user_id].merge(pending) if user_id in users else pending
+
+        if self.flush_delay <= 0:
+            await self._flush_key(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._delayed_flush(key))
+
+    async def _delayed_flush(self, key, delay=None):
+        await asyncio.sleep(self.flush_delay if delay is None else delay)
+        self._timers.pop(key, None)
+        await self._flush_key(key)
+
+    async def _flush_key(self, key):
+        # лок гарантує порядок записів у межах файлу; False — запис не вдався, зміни знову в черзі
+        async with self._lock(key):
+            users = self._pending.pop(key, None)
+            if not users:
+                return True
+            written = set()
+            try:
+                await asyncio.to_thread(self._write, self._paths[key], users, written)
+            except Exception as e:
+                print(f"[!] Не вдалося записати {self._paths[key]}: {e}")
+                # повертаємо в чергу лише незаписаних користувачів, не обганяючи новіші зміни
+                users = {user_id: pending for user_id, pending in users.items() if user_id not in written}
+                newer = self._pending.get(key, {})
+                for user_id, pending in newer.items():
+                    users[user_id] = users[user_id].merge(pending) if user_id in users else pending
+                self._pending[key] = users
+                if key not in self._timers:
+                    self._timers[key] = asyncio.create_task(self._delayed_flush(key, max(self.flush_delay, 1.0)))
+                return False
+            return True
+
+    @staticmethod
+    def _write(file_path, users, written):
+        # written заповнюється по ходу: після збою видно, чиї зміни вже на диску
+        backend = get_backend()
+        replaced = {}
+        for user_id, pending in users.items():
+            if pending.value is _UNSET:
+                backend.apply_ops(file_path, user_id, pending.ops)
+                written.add(user_id)
+            else:
+                replaced[user_id] = pending.apply(None)
+        if replaced:
+            backend.set_many(file_path, replaced)
+            written.update(replaced)
+
+    async def flush(self, file_path=None):
+        # True — усе з черги на диску
+        keys = [self._key(file_path)] if file_path else list(self._pending)
+        flushed = True
+        for key in keys:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            flushed = await self._flush_key(key) and flushed
+        return flushed
+
+    async def close(self):
+        await self.flush()
+
+
+store = AsyncStore()
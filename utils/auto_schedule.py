@@ -0,0 +1,168 @@
+# Розклад автоматичних записів. Кожен шаблон зберігає next_fire — момент наступного
+# спрацювання, а в пам'яті лежить купа (heapq) цих моментів: цикл спить до найближчого
+# і чіпає лише шаблони, час яких настав, замість щохвилинного перебору всіх.
+# last_posted — час останнього проведеного спрацювання: після простою бота всі пропущені
+# спрацювання від нього до теперішнього моменту проводяться за один прохід.
+import asyncio
+import calendar
+import hashlib
+import heapq
+from datetime import datetime, timedelta
+
+from utils.async_store import store
+from utils.helpers import AUTO_INCOME_FILE, new_entry_id
+
+FIRE_FORMAT = "%Y-%m-%dT%H:%M"
+MAX_SLEEP = 600  # секунд; довгий сон все одно звіряється з годинником (переведення часу тощо)
+
+
+def parse_fire(value):
+    try:
+        return datetime.strptime(value, FIRE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_fire(moment):
+    return moment.strftime(FIRE_FORMAT) if moment else None
+
+
+def _clock(value):
+    try:
+        hour, minute = value.split(":")
+        return int(hour), int(minute)
+    except (AttributeError, ValueError):
+        return None
+
+
+def fire_time(entry, after):
+    # перше спрацювання шаблону строго після after; None — шаблон не спрацює ніколи
+    clock = _clock(entry.get("time"))
+    if clock is None:
+        return None
+    hour, minute = clock
+    interval = entry.get("interval")
+
+    if interval == "daily":
+        fire = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return fire if fire > after else fire + timedelta(days=1)
+
+    if interval == "weekly":
+        for shift in range(8):
+            fire = (after + timedelta(days=shift)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if fire > after and fire.strftime("%A") == entry.get("day_of_week"):
+                return fire
+        return None
+
+    if interval == "monthly":
+        target = entry.get("day_of_month")
+        if not target:
+            return None
+        year, month = after.year, after.month
+        for _ in range(2):
+            # 31-го у коротшому місяці — в останній день місяця
+            last_day = calendar.monthrange(year, month)[1]
+            fire = datetime(year, month, min(target, last_day), hour, minute)
+            if fire > after:
+                return fire
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return None
+
+
+def occurrences(entry, now):
+    # усі спрацювання від last_posted (не включно) до now; новий шаблон — від першого next_fire
+    start = parse_fire(entry.get("last_posted"))
+    if start is None:
+        first = parse_fire(entry.get("next_fire"))
+        if first is None:
+            return []
+        start = first - timedelta(minutes=1)
+    fires = []
+    fire = fire_time(entry, start)
+    while fire is not None and fire <= now:
+        fires.append(fire)
+        fire = fire_time(entry, fire)
+    return fires
+
+
+def occurrence_key(entry, fire):
+    # id проведеного запису: те саме спрацювання того самого шаблону — завжди той самий id
+    # (10 hex-символів, як у new_entry_id — Ledger зберігає id числом)
+    return hashlib.blake2b(f"{entry['id']}:{fire:%Y%m%d%H%M}".encode(), digest_size=5).hexdigest()
+
+
+class AutoScheduler:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._heap = []  # (next_fire, user_id, id шаблону)
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _push(self, fire, user_id, entry_id):
+        item = (fire, user_id, entry_id)
+        heapq.heappush(self._heap, item)
+        if self._heap[0] is item:
+            self._wakeup.set()  # нове найближче спрацювання — цикл має перерахувати сон
+
+    async def load(self, now):
+        # шаблони без id чи next_fire отримують їх; пропущені за час простою next_fire
+        # лишаються в минулому — перший же прохід циклу проведе їх усі разом
+        self._heap = []
+        for user_id, entries in await store.iter_users(self.file_path):
+            changed = False
+            for entry in entries or []:
+                if "id" not in entry:
+                    entry["id"] = new_entry_id()
+                    changed = True
+                fire = parse_fire(entry.get("next_fire"))
+                if fire is None:
+                    fire = fire_time(entry, now)
+                    entry["next_fire"] = format_fire(fire)
+                    changed = True
+                if fire is not None:
+                    self._heap.append((fire, str(user_id), entry["id"]))
+            if changed:
+                await store.set(self.file_path, user_id, entries)
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def schedule(self, user_id, entry, after):
+        # новий шаблон або наступне спрацювання після виконаного
+        entry.setdefault("id", new_entry_id())
+        fire = fire_time(entry, after)
+        entry["next_fire"] = format_fire(fire)
+        if fire is not None:
+            self._push(fire, str(user_id), entry["id"])
+
+    async def wait(self):
+        # сон до найближчого next_fire; новий раніший шаблон будить цикл через подію
+        while True:
+            self._wakeup.clear()
+            timeout = MAX_SLEEP
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - datetime.now()).total_seconds())
+                if timeout <= 0:
+                    return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def restore(self, due):
+        # повертає в купу зняте pop_due, якщо обробка не вдалася
+        for user_id, fired in due.items():
+            for entry_id, fire in fired.items():
+                self._push(fire, user_id, entry_id)
+
+    def pop_due(self, now):
+        # {user_id: {id шаблону: next_fire}} для всього, що настало до now
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            fire, user_id, entry_id = heapq.heappop(self._heap)
+            due.setdefault(user_id, {})[entry_id] = fire
+        return due
+
+
+auto_scheduler = AutoScheduler(AUTO_INCOME_FILE)
@@ -0,0 +1,48 @@
+# Кеш готових PNG діаграм (і PDF-звітів): (user_id, вид, версія даних) -> байти.
+# Версія — лічильник записів AsyncStore, тож після будь-якої зміни даних старий ключ
+# просто не збігається; застаріла картинка того ж виду витісняється одразу.
+# Розмір обмежений сумою байтів, найдавніше використані вилітають першими.
+from collections import OrderedDict
+
+from config import CHART_CACHE_BYTES
+
+
+class PngCache:
+    def __init__(self, max_bytes=CHART_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # (user_id, kind) -> (версія, байти)
+
+    def get(self, user_id, kind, version):
+        item = self._items.get((str(user_id), kind))
+        if item is None or item[0] != version:
+            self.misses += 1
+            return None
+        self._items.move_to_end((str(user_id), kind))
+        self.hits += 1
+        return item[1]
+
+    def put(self, user_id, kind, version, png):
+        key = (str(user_id), kind)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old[1])
+        if len(png) > self.max_bytes:
+            return
+        self._items[key] = (version, png)
+        self.size += len(png)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._items.popitem(last=False)
+            self.size -= len(evicted)
+
+    def invalidate(self, user_id):
+        for key in [k for k in self._items if k[0] == str(user_id)]:
+            self.size -= len(self._items.pop(key)[1])
+
+    def __len__(self):
+        return len(self._items)
+
+
+chart_cache = PngCache()
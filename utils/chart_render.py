@@ -0,0 +1,119 @@
+# Малювання діаграм: на вході прості дані (dict, str), на виході байти PNG.
+# Виконується у процесах пулу (utils/render_pool.py), тож нічого з бота сюди не імпортується.
+# CHART_RENDERER: "matplotlib" — якісніше, "native" — utils/native_chart.py без залежностей.
+from io import BytesIO
+
+from config import CHART_RENDERER
+
+_plt = None
+
+
+def load_pyplot():
+    # matplotlib завантажується лише тоді, коли ним справді малюють
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def warm_up():
+    # ініціалізатор процесу: шрифти й pyplot завантажуються один раз на процес
+    if CHART_RENDERER == "native":
+        from utils import native_chart
+        native_chart._font()
+        return
+    plt = load_pyplot()
+    plt.figure()
+    plt.close("all")
+
+
+def donut_png(data, title):
+    if CHART_RENDERER == "native":
+        from utils.native_chart import donut_png as native_donut_png
+        return native_donut_png(data, title)
+    return matplotlib_donut_png(data, title)
+
+
+def pie_png(data, title):
+    # простіша кругова діаграма для PDF
+    if CHART_RENDERER == "native":
+        from utils.native_chart import donut_png as native_donut_png
+        return native_donut_png(data, title)
+    plt = load_pyplot()
+    fig, ax = plt.subplots()
+    ax.pie(list(data.values()), labels=list(data.keys()), autopct="%1.1f%%", startangle=90)
+    ax.axis("equal")
+    ax.set_title(title)
+    buf = BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def matplotlib_donut_png(data, title):
+    plt = load_pyplot()
+    labels = list(data.keys())
+    values = list(data.values())
+
+    colors = plt.get_cmap('Set3').colors
+
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.pie(
+        values,
+        labels=labels,
+        autopct='%1.1f%%',
+        startangle=90,
+        colors=colors,
+        textprops={'fontsize': 14}
+    )
+
+    ax.set_title(title, fontsize=16)
+
+    buf = BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return buf.getvalue()
+
+
+def series_png(series, title):
+    # series — Series.to_plain(): точки з (середнє, мінімум, максимум) для прибутків і витрат.
+    # Лише matplotlib: native-рендер малює тільки кругові діаграми.
+    from datetime import date
+
+    plt = load_pyplot()
+    x = [date.fromordinal(d) for d in series["starts"]]
+    group = series["group"]
+    width = (7 if series["period"] == "week" else 1) * group
+
+    fig, ax = plt.subplots(figsize=(9, 4.5))
+    lines = (("income", "Прибутки", "#4daf4a"), ("expenses", "Витрати", "#e41a1c"))
+    if group == 1 and len(x) <= 45:
+        # мало точок — стовпчики поруч
+        for offset, (key, label, color) in zip((-0.2, 0.2), lines):
+            ax.bar([d.toordinal() + offset * width for d in x], [p[0] for p in series[key]],
+                   width=0.4 * width, label=label, color=color)
+        ax.set_xticks([d.toordinal() for d in x][::max(1, len(x) // 10)])
+        ax.set_xticklabels([d.strftime("%d/%m") for d in x][::max(1, len(x) // 10)])
+    else:
+        for key, label, color in lines:
+            points = series[key]
+            ax.plot(x, [p[0] for p in points], label=label, color=color, linewidth=1.5)
+            if group > 1:
+                ax.fill_between(x, [p[1] for p in points], [p[2] for p in points], color=color, alpha=0.15)
+        fig.autofmt_xdate()
+
+    unit = "тиждень" if series["period"] == "week" else "день"
+    note = f" (середнє за {group} × {unit}, смуга — мін/макс)" if group > 1 else f" (грн за {unit})"
+    ax.set_title(title + note, fontsize=12)
+    ax.grid(axis="y", alpha=0.3)
+    ax.legend()
+
+    buf = BytesIO()
+    fig.tight_layout()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return buf.getvalue()
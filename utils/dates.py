@@ -0,0 +1,51 @@
+# Дати в боті: усередині — цілі ординали (date.toordinal()), рядок "ДД/ММ/РРРР" — лише для показу.
+# Розбір без strptime для двох форматів, які вводять користувачі: "01/04/2025" і "01042025".
+from datetime import date, datetime
+from functools import lru_cache
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def _ordinal(day, month, year):
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_day(value):
+    # рядок дати (або вже ординал) -> ординал; None, якщо дата невірна
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value > 0 else None
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if not value.isascii():
+        return None
+    if len(value) == 10 and value[2] == "/" and value[5] == "/":
+        d, m, y = value[:2], value[3:5], value[6:]
+        if d.isdigit() and m.isdigit() and y.isdigit():
+            return _ordinal(int(d), int(m), int(y))
+        return None
+    if len(value) == 8 and value.isdigit():
+        return _ordinal(int(value[:2]), int(value[2:4]), int(value[4:]))
+    # рідкісні варіанти на кшталт "1/4/2025"
+    try:
+        return datetime.strptime(value, DATE_FORMAT).toordinal()
+    except ValueError:
+        return None
+
+
+def parse_date(value):
+    day = parse_day(value)
+    return date.fromordinal(day) if day else None
+
+
+@lru_cache(maxsize=4096)
+def format_day(day):
+    d = date.fromordinal(day)
+    return f"{d.day:02d}/{d.month:02d}/{d.year:04d}"
+
+
+def today():
+    return date.today().toordinal()
@@ -0,0 +1,119 @@
+# Агрегації по колонках Ledger: суми за категоріями, підсумки за днями,
+# тижнями, місяцями чи роками й топ-N.
+# Великі журнали рахуються векторно через NumPy, решта — звичайними циклами.
+# NumPy необов'язковий і імпортується лише при першому великому журналі.
+# Обидва варіанти додають суми в тому самому порядку, тож результати однакові.
+from datetime import date
+
+from config import VECTOR_MIN_ROWS
+
+np = None
+_numpy_checked = False
+
+PERIODS = ("day", "week", "month", "year")
+
+_EPOCH = date(1970, 1, 1).toordinal()  # ординал, що відповідає datetime64 з нулем
+
+
+def use_numpy(rows):
+    global np, _numpy_checked
+    if rows < VECTOR_MIN_ROWS:
+        return False
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            pass
+    return np is not None
+
+
+def _columns(ledger, start, stop):
+    amounts = np.frombuffer(ledger.amounts, dtype=np.float64)[start:stop]
+    cats = np.frombuffer(ledger.cats, dtype=np.dtype(f"u{ledger.cats.itemsize}"))[start:stop]
+    days = np.frombuffer(ledger.days, dtype=np.dtype(f"i{ledger.days.itemsize}"))[start:stop]
+    return amounts, cats, days
+
+
+# --- сума за категоріями: {номер категорії: сума} у порядку першої появи ---
+def sum_by_category(ledger, start, stop, positive_only=False):
+    if use_numpy(stop - start):
+        return _np_sum_by_category(ledger, start, stop, positive_only)
+    sums = {}
+    for cat_id, amount in zip(ledger.cats[start:stop], ledger.amounts[start:stop]):
+        if positive_only and amount <= 0:
+            continue
+        sums[cat_id] = sums.get(cat_id, 0) + amount
+    return sums
+
+
+def _np_sum_by_category(ledger, start, stop, positive_only):
+    amounts, cats, _ = _columns(ledger, start, stop)
+    if positive_only:
+        mask = amounts > 0
+        amounts, cats = amounts[mask], cats[mask]
+    if not len(cats):
+        return {}
+    keys, first, inverse = np.unique(cats, return_index=True, return_inverse=True)
+    # bincount додає ваги послідовно, як і цикл вище
+    totals = np.bincount(inverse, weights=amounts, minlength=len(keys))
+    order = np.argsort(first, kind="stable")
+    return {int(keys[i]): float(totals[i]) for i in order}
+
+
+# --- підсумки за періодами: {ординал першого дня періоду: сума}, за зростанням ---
+def _bucket_start(day, period):
+    if period == "day":
+        return day
+    if period == "week":
+        return day - (day - 1) % 7  # ординал 1 — понеділок
+    d = date.fromordinal(day)
+    if period == "month":
+        return date(d.year, d.month, 1).toordinal()
+    return date(d.year, 1, 1).toordinal()
+
+
+def bucket_totals(ledger, start, stop, period="day"):
+    if period not in PERIODS:
+        raise ValueError(f"Невідомий період: {period}")
+    # рядки без розібраної дати (days == 0) стоять на початку — пропускаємо їх
+    while start < stop and not ledger.days[start]:
+        start += 1
+    if use_numpy(stop - start):
+        return _np_bucket_totals(ledger, start, stop, period)
+    sums = {}
+    last_day = last_key = None
+    for day, amount in zip(ledger.days[start:stop], ledger.amounts[start:stop]):
+        if day != last_day:
+            last_day, last_key = day, _bucket_start(day, period)
+        sums[last_key] = sums.get(last_key, 0) + amount
+    return sums
+
+
+def _np_bucket_totals(ledger, start, stop, period):
+    amounts, _, days = _columns(ledger, start, stop)
+    days = days.astype(np.int64)
+    if period == "day":
+        keys = days
+    elif period == "week":
+        keys = days - (days - 1) % 7
+    else:
+        unit = "M" if period == "month" else "Y"
+        as_dates = (days - _EPOCH).astype("datetime64[D]")
+        keys = as_dates.astype(f"datetime64[{unit}]").astype("datetime64[D]").astype(np.int64) + _EPOCH
+    if not len(keys):
+        return {}
+    buckets, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=amounts, minlength=len(buckets))
+    return {int(k): float(v) for k, v in zip(buckets, totals)}
+
+
+# --- топ-N: [(ключ, сума)] за спаданням суми, за рівності — у вихідному порядку ---
+def top_n(sums, n):
+    if not use_numpy(len(sums)):
+        return sorted(sums.items(), key=lambda item: -item[1])[:n]
+    keys = list(sums)
+    values = np.fromiter(sums.values(), dtype=np.float64, count=len(keys))
+    order = np.argsort(-values, kind="stable")[:n]
+    return [(keys[i], float(values[i])) for i in order]
@@ -1,5 +1,7 @@
 import os
 import json
+import secrets
+import threading
 
 DATA_PATH = "data"
 EXPENSES_FILE = os.path.join(DATA_PATH, "expenses.json")
@@ -8,22 +10,25 @@ INCOME_FILE = os.path.join(DATA_PATH, "income.json")
 INCOME_CATEGORIES_FILE = os.path.join(DATA_PATH, "income_categories.json")
 SETTINGS_FILE = "data/settings.json"
 AUTO_INCOME_FILE = os.path.join(DATA_PATH, "auto_income.json")
+SQLITE_FILE = os.path.join(DATA_PATH, "finance.db")
+
+# Файли зі списками записів {category, amount, date}; решта — довільні значення на користувача
+LEDGER_FILES = ("expenses", "income")
 
 def ensure_files():
     os.makedirs(DATA_PATH, exist_ok=True)
 
-    if not os.path.exists(EXPENSES_FILE):
-        with open(EXPENSES_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f, ensure_ascii=False, indent=2)
+    # витрати і прибутки зберігаються окремим файлом на користувача: data/expenses/<user_id>.json
+    for ledger_file in (EXPENSES_FILE, INCOME_FILE):
+        os.makedirs(shard_dir(ledger_file), exist_ok=True)
+        if os.path.exists(ledger_file):
+            split_ledger_file(ledger_file)
+    get_backend().migrate_entries()
 
     if not os.path.exists(CATEGORIES_FILE):
         with open(CATEGORIES_FILE, "w", encoding="utf-8") as f:
             json.dump({}, f, ensure_ascii=False, indent=2)
 
-    if not os.path.exists(INCOME_FILE):
-        with open(INCOME_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f, ensure_ascii=False, indent=2)
-
     if not os.path.exists(INCOME_CATEGORIES_FILE):
         with open(INCOME_CATEGORIES_FILE, "w", encoding="utf-8") as f:
             json.dump({}, f, ensure_ascii=False, indent=2)
@@ -32,12 +37,156 @@ def ensure_files():
         with open(AUTO_INCOME_FILE, "w", encoding="utf-8") as f:
             json.dump({}, f, ensure_ascii=False, indent=2)
 
+    if not os.path.exists(SETTINGS_FILE):
+        with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
+            json.dump({}, f, ensure_ascii=False, indent=2)
+
+
+def shard_dir(file_path):
+    return os.path.splitext(file_path)[0]
+
+
+def shard_path(file_path, user_id):
+    return os.path.join(shard_dir(file_path), f"{user_id}.json")
+
+
+def journal_path(file_path, user_id):
+    return os.path.join(shard_dir(file_path), f"{user_id}.jsonl")
+
+
+def split_ledger_file(file_path):
+    # Міграція зі старого формату (один файл на всіх користувачів).
+    # Вже записані шарди не перезаписуються, тож перерваний запуск можна повторити.
+    data = load_data(file_path)
+    for user_id, entries in data.items():
+        path = shard_path(file_path, user_id)
+        if not os.path.exists(path):
+            write_json(path, entries)
+    os.replace(file_path, file_path + ".migrated")
+    print(f"✅ {file_path} розділено на {len(data)} файлів у {shard_dir(file_path)}")
+
+
+# Кеш розібраних файлів на весь процес: шлях -> ((mtime_ns, size), дані).
+# load_data повертає спільний об'єкт, тому змінювати його можна лише
+# перед викликом save_data для того ж файлу.
+_cache = {}
+_cache_lock = threading.RLock()
+
+
+def _cache_key(file_path):
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+def _file_stamp(file_path):
+    st = os.stat(file_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_cached(file_path, parse):
+    key = _cache_key(file_path)
+    with _cache_lock:
+        # stat до читання: якщо файл змінять під час читання, наступний виклик перечитає його
+        stamp = _file_stamp(file_path)
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = parse(f)
+        _cache[key] = (stamp, data)
+        return data
+
 def load_data(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return _load_cached(file_path, json.load)
 
-def save_data(file_path, data):
-    with open(file_path, "w", encoding="utf-8") as f:
+def write_json(file_path, data):
+    # запис через тимчасовий файл: читач бачить або старий, або новий вміст
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+def save_data(file_path, data):
+    key = _cache_key(file_path)
+    with _cache_lock:
+        write_json(file_path, data)
+        _cache[key] = (_file_stamp(file_path), data)
+
 
 message_tracker = {}
+
+
+def file_key(file_path):
+    # "data/income.json" і "data\\income.json" -> "income"
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+
+def new_entry_id():
+    return secrets.token_hex(5)
+
+
+# Зміни записів журналу: ("add", entry), ("update", entry_id, changes), ("delete", entry_id).
+# by_id — впорядкований dict id -> запис; змінені записи замінюються новими dict,
+# тож раніше видані назовні об'єкти не змінюються.
+def apply_ops(by_id, ops):
+    for op in ops:
+        kind = op[0]
+        if kind == "add":
+            by_id[op[1]["id"]] = op[1]
+        elif kind == "update":
+            entry = by_id.get(op[1])
+            if entry is not None:
+                by_id[op[1]] = {**entry, **op[2]}
+        elif kind == "delete":
+            by_id.pop(op[1], None)
+    return by_id
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        from config import STORAGE_BACKEND
+        if STORAGE_BACKEND == "sqlite":
+            from utils.sqlite_store import SqliteBackend
+            _backend = SqliteBackend(SQLITE_FILE)
+        else:
+            from utils.json_store import JsonBackend
+            _backend = JsonBackend()
+    return _backend
+
+
+# --- API на рівні користувача (працює з обома бекендами) ---
+# Для JSON-бекенду get_user_data повертає закешований об'єкт:
+# після змін його треба зберегти через set_user_data.
+def get_user_data(file_path, user_id, default=None):
+    return get_backend().get_user_data(file_path, user_id, default)
+
+def set_user_data(file_path, user_id, value):
+    get_backend().set_user_data(file_path, user_id, value)
+
+def add_entry(file_path, user_id, entry):
+    get_backend().add_entry(file_path, user_id, entry)
+
+def get_ledger(file_path, user_id):
+    return get_backend().get_ledger(file_path, user_id)
+
+def iter_rows(file_path, user_id, chunk_size=1000):
+    return get_backend().iter_rows(file_path, user_id, chunk_size)
+
+def get_totals(file_path, user_id):
+    return get_backend().get_totals(file_path, user_id)
+
+def get_entry(file_path, user_id, entry_id):
+    return get_backend().get_entry(file_path, user_id, entry_id)
+
+def find_entries(file_path, user_id, category=None, date_from=None, date_to=None):
+    return get_backend().find_entries(file_path, user_id, category, date_from, date_to)
+
+def iter_users(file_path):
+    return get_backend().iter_users(file_path)
+
+def compact_storage():
+    return get_backend().compact()
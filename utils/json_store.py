@@ -0,0 +1,296 @@
+import json
+import os
+import threading
+
+from utils.helpers import (
+    DATA_PATH, EXPENSES_FILE, INCOME_FILE, LEDGER_FILES,
+    load_data, save_data, write_json, file_key, shard_dir, shard_path, journal_path,
+    new_entry_id
+)
+from utils.ledger import Ledger, is_entry_id
+
+
+# Версія формату записів у шардах: 1 — id записів, 2 — дати ординалами (і правки дат
+# зі старих журналів). Міграція проходить усі шарди один раз і записує версію сюди.
+MIGRATION_FILE = os.path.join(DATA_PATH, "storage_version.json")
+ENTRIES_VERSION = 2
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# --- Журнал змін: один JSON-рядок на операцію ---
+# Доданий запис пишеться як є (сумісно зі старими журналами),
+# редагування і видалення — як {"op": "update"|"delete", "id": ...}.
+def _op_line(op):
+    if op[0] == "add":
+        line = op[1]
+    elif op[0] == "update":
+        line = {"op": "update", "id": op[1], "changes": op[2]}
+    else:
+        line = {"op": "delete", "id": op[1]}
+    return json.dumps(line, ensure_ascii=False) + "\n"
+
+
+def _read_journal(path):
+    ops = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # недописаний рядок після аварійної зупинки
+            if item.get("op") == "update":
+                ops.append(("update", item["id"], item["changes"]))
+            elif item.get("op") == "delete":
+                ops.append(("delete", item["id"]))
+            else:
+                ops.append(("add", item))
+    return ops
+
+
+def _new_ops(ledger, ops):
+    # додавання з id, який уже є в записах, у журнал не потрапляють — повтор запису після збою
+    added, deleted = set(), set()
+    fresh = []
+    for op in ops:
+        if op[0] == "add":
+            entry_id = op[1].get("id")
+            if entry_id in added or (entry_id not in deleted and ledger.get(entry_id) is not None):
+                continue
+            added.add(entry_id)
+            deleted.discard(entry_id)
+        elif op[0] == "delete":
+            added.discard(op[1])
+            deleted.add(op[1])
+        fresh.append(op)
+    return fresh
+
+
+class _LedgerState:
+    # розібраний знімок + журнал одного користувача; stamps — (mtime, size) обох файлів
+    __slots__ = ("stamps", "ledger")
+
+    def __init__(self, stamps, ledger):
+        self.stamps = stamps
+        self.ledger = ledger
+
+
+class JsonBackend:
+    def __init__(self):
+        self._states = {}  # (файл, user_id) -> _LedgerState
+        self._lock = threading.RLock()
+
+    def _is_ledger(self, file_path):
+        return file_key(file_path) in LEDGER_FILES
+
+    def _state(self, file_path, user_id):
+        snapshot, journal = shard_path(file_path, user_id), journal_path(file_path, user_id)
+        stamps = (_stamp(snapshot), _stamp(journal))
+        key = (file_key(file_path), str(user_id))
+        state = self._states.get(key)
+        if state is not None and state.stamps == stamps:
+            return state
+
+        outdated = False
+        entries = []
+        if stamps[0] is not None:
+            with open(snapshot, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        ops = _read_journal(journal) if stamps[1] is not None else []
+        added = [op[1] for op in ops if op[0] == "add"]
+        for e in entries + added:
+            if not is_entry_id(e.get("id")):
+                e["id"] = new_entry_id()
+                outdated = True
+            if "day" not in e:
+                outdated = True  # дата ще рядком — переписуємо ординалом
+        if any(op[0] == "update" and "date" in op[2] and "day" not in op[2] for op in ops):
+            outdated = True  # стара правка дати рядком — переносимо у знімок уже ординалом
+        ledger = Ledger.from_entries(entries).apply_ops(ops)
+
+        if outdated:
+            # старі записи: одразу зберігаємо, щоб id не змінювались між перезапусками
+            self._write_snapshot(file_path, user_id, ledger.to_records())
+            stamps = (_stamp(snapshot), None)
+
+        state = _LedgerState(stamps, ledger)
+        self._states[key] = state
+        return state
+
+    def _write_snapshot(self, file_path, user_id, entries):
+        write_json(shard_path(file_path, user_id), entries)
+        journal = journal_path(file_path, user_id)
+        if os.path.exists(journal):
+            os.remove(journal)
+
+    def get_user_data(self, file_path, user_id, default=None):
+        if self._is_ledger(file_path):
+            with self._lock:
+                state = self._state(file_path, user_id)
+                if state.stamps == (None, None):
+                    return default
+                return state.ledger.to_dicts()
+        return load_data(file_path).get(str(user_id), default)
+
+    def _peek(self, file_path, user_id):
+        # разове читання: стан не лишається в кеші, якщо його там не було (викликається під локом)
+        key = (file_key(file_path), str(user_id))
+        cached = key in self._states
+        state = self._state(file_path, user_id)
+        if not cached:
+            del self._states[key]
+        return state
+
+    def get_ledger(self, file_path, user_id):
+        # копія: масиви копіюються одним memcpy, а спільний стан далі змінюється під локом
+        with self._lock:
+            return self._state(file_path, user_id).ledger.copy()
+
+    def iter_rows(self, file_path, user_id, chunk_size=1000):
+        # (ординал, категорія, сума) за датами, порціями; читається з копії колонок.
+        # Разове вивантаження (PDF-журнал) не лишає користувача в кеші станів
+        with self._lock:
+            ledger = self._peek(file_path, user_id).ledger.copy()
+        for start in range(0, len(ledger), chunk_size):
+            yield ledger.row_tuples(start, start + chunk_size)
+
+    def get_totals(self, file_path, user_id):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.totals.copy()
+
+    # вузькі запити до підсумків: рахуються під локом на спільному стані, без копії Totals
+    def category_totals(self, file_path, user_id):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.totals.sum_by_category()
+
+    def daily_totals(self, file_path, user_id, date_from, date_to):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.totals.daily(date_from, date_to)
+
+    def day_total(self, file_path, user_id, day):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.totals.day_total(day)
+
+    def sum_by_category(self, file_path, user_id, date_from=None, date_to=None, cache=True):
+        # рахується прямо на спільному стані, без копіювання колонок;
+        # cache=False — разове читання (розсилка виписок), стан не лишається в кеші
+        with self._lock:
+            state = self._state(file_path, user_id) if cache else self._peek(file_path, user_id)
+            return state.ledger.sum_by_category(date_from, date_to)
+
+    def monthly_rollups(self, file_path, user_id, first_month, last_month):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.totals.monthly(first_month, last_month)
+
+    def get_entry(self, file_path, user_id, entry_id):
+        with self._lock:
+            entry = self._state(file_path, user_id).ledger.get(entry_id)
+            return entry.to_dict() if entry is not None else None
+
+    def set_user_data(self, file_path, user_id, value):
+        if self._is_ledger(file_path):
+            with self._lock:
+                for e in value:
+                    if not is_entry_id(e.get("id")):
+                        e["id"] = new_entry_id()
+                self._write_snapshot(file_path, user_id, Ledger.from_entries(value).to_records())
+                self._states.pop((file_key(file_path), str(user_id)), None)
+            return
+        data = load_data(file_path)
+        data[str(user_id)] = value
+        save_data(file_path, data)
+
+    def set_many(self, file_path, values):
+        if self._is_ledger(file_path):
+            for user_id, value in values.items():
+                self.set_user_data(file_path, user_id, value)
+            return
+        # один перезапис спільного файлу на всю пачку змін
+        data = load_data(file_path)
+        for user_id, value in values.items():
+            data[str(user_id)] = value
+        save_data(file_path, data)
+
+    def add_entry(self, file_path, user_id, entry):
+        self.add_entries(file_path, user_id, [entry])
+
+    def add_entries(self, file_path, user_id, new_entries):
+        if self._is_ledger(file_path):
+            for e in new_entries:
+                if not is_entry_id(e.get("id")):
+                    e["id"] = new_entry_id()
+            self.apply_ops(file_path, user_id, [("add", e) for e in new_entries])
+            return
+        entries = self.get_user_data(file_path, user_id, [])
+        entries.extend(new_entries)
+        self.set_user_data(file_path, user_id, entries)
+
+    def apply_ops(self, file_path, user_id, ops):
+        # одне дописування в журнал на всю пачку змін
+        with self._lock:
+            state = self._state(file_path, user_id)
+            ops = _new_ops(state.ledger, ops)
+            if not ops:
+                return
+            journal = journal_path(file_path, user_id)
+            with open(journal, "a", encoding="utf-8") as f:
+                f.write("".join(_op_line(op) for op in ops))
+            state.ledger.apply_ops(ops)
+            state.stamps = (state.stamps[0], _stamp(journal))
+
+    def compact(self):
+        # переносить журнали у знімки; повертає кількість оброблених користувачів
+        compacted = 0
+        for ledger_file in (EXPENSES_FILE, INCOME_FILE):
+            for name in os.listdir(shard_dir(ledger_file)):
+                if not name.endswith(".jsonl"):
+                    continue
+                user_id = name[:-len(".jsonl")]
+                with self._lock:
+                    state = self._state(ledger_file, user_id)
+                    if not state.ledger.rebuild_totals():
+                        print(f"[!] Підсумки {file_key(ledger_file)} для {user_id} розійшлися з записами — перераховано")
+                    self._write_snapshot(ledger_file, user_id, state.ledger.to_records())
+                    state.stamps = (_stamp(shard_path(ledger_file, user_id)), None)
+                compacted += 1
+        return compacted
+
+    def migrate_entries(self):
+        # розбір стану сам дописує id старим записам і переводить дати в ординали;
+        # виконується один раз на версію формату, розібрані стани в пам'яті не лишаються
+        try:
+            version = load_data(MIGRATION_FILE).get("entries", 0)
+        except (FileNotFoundError, ValueError):
+            version = 0
+        if version >= ENTRIES_VERSION:
+            return
+        for ledger_file in (EXPENSES_FILE, INCOME_FILE):
+            for user_id in self._user_ids(ledger_file):
+                with self._lock:
+                    self._peek(ledger_file, user_id)
+        write_json(MIGRATION_FILE, {"entries": ENTRIES_VERSION})
+
+    def find_entries(self, file_path, user_id, category=None, date_from=None, date_to=None):
+        with self._lock:
+            return self._state(file_path, user_id).ledger.find(category, date_from, date_to)
+
+    def iter_users(self, file_path):
+        if self._is_ledger(file_path):
+            return [(user_id, self.get_user_data(file_path, user_id, [])) for user_id in self._user_ids(file_path)]
+        return list(load_data(file_path).items())
+
+    def _user_ids(self, file_path):
+        return sorted({
+            os.path.splitext(name)[0]
+            for name in os.listdir(shard_dir(file_path))
+            if name.endswith((".json", ".jsonl"))
+        })
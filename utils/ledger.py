@@ -0,0 +1,472 @@
+import threading
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+from utils import engine
+from utils.dates import parse_day, format_day
+from utils.helpers import new_entry_id
+
+# Колонкове представлення записів одного користувача.
+# Замість списку dict {id, category, amount, date} — кілька масивів однакової довжини:
+#   ids     — id записів як 40-бітні числа (new_entry_id дає 10 hex-символів)
+#   amounts — суми, array('d')
+#   days    — дати як date.toordinal(), 0 — дата, яку не вдалося розібрати
+#   cats    — номери категорій у спільній таблиці на весь процес
+#   seqs    — порядковий номер додавання (в межах дня зростає)
+# Це ~36 байт на запис (плюс Totals — за днями й категоріями, не за записами)
+# замість кількох сотень у dict з рядками.
+# Рядки впорядковані за датою (записи одного дня — в порядку додавання),
+# тож вибірка за період — це два бінарні пошуки по days.
+# Пошук за id: відсортований масив id -> (день, seq), ще ~16 байт на запис; будується
+# при першому пошуку, тож копії для звітів без нього. Рядок знаходиться бінарним пошуком
+# по days і далі по seqs у межах дня — O(log n), без зсуву індексів при вставках.
+
+_category_names = []
+_category_ids = {}
+_category_lock = threading.Lock()
+
+
+def category_id(name):
+    cat_id = _category_ids.get(name)
+    if cat_id is None:
+        with _category_lock:
+            cat_id = _category_ids.get(name)
+            if cat_id is None:
+                cat_id = len(_category_names)
+                _category_names.append(name)
+                _category_ids[name] = cat_id
+    return cat_id
+
+
+def category_name(cat_id):
+    return _category_names[cat_id]
+
+
+def is_entry_id(value):
+    if not isinstance(value, str) or len(value) != 10:
+        return False
+    try:
+        int(value, 16)
+    except ValueError:
+        return False
+    return True
+
+
+def entry_day(entry):
+    # (ординал, сирий рядок): записи зберігають "day", старі — рядок "date"
+    day = parse_day(entry.get("day"))
+    if day:
+        return day, ""
+    raw = entry.get("date", "")
+    return parse_day(raw) or 0, raw
+
+
+def month_key(day):
+    d = date.fromordinal(day)
+    return d.year * 12 + d.month - 1
+
+
+def _bump(sums, key, amount, count):
+    # sums[key] = [сума, кількість записів]; ключ зникає разом з останнім записом
+    item = sums.get(key)
+    if item is None:
+        sums[key] = [amount, count]
+        return
+    item[0] += amount
+    item[1] += count
+    if item[1] <= 0:
+        del sums[key]
+
+
+# Поточні підсумки користувача: оновлюються при кожному додаванні, редагуванні
+# й видаленні, тож звіти й діаграми читають O(категорій), а не всі записи.
+class Totals:
+    __slots__ = (
+        "count", "total", "by_category", "positive_by_category", "by_day", "by_month", "by_month_category", "days"
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.by_category = {}           # номер категорії -> [сума, кількість]
+        self.positive_by_category = {}  # те саме лише для додатних сум (діаграми, PDF)
+        self.by_day = {}                # ординал дати -> [сума, кількість]
+        self.by_month = {}              # рік * 12 + місяць - 1 -> [сума, кількість]
+        self.by_month_category = {}     # (місяць, номер категорії) -> [сума, кількість]
+        self.days = array("l")          # відсортовані ключі by_day для запитів за період
+
+    def add(self, cat_id, amount, day, sign=1):
+        self.count += sign
+        self.total += sign * amount
+        _bump(self.by_category, cat_id, sign * amount, sign)
+        if amount > 0:
+            _bump(self.positive_by_category, cat_id, sign * amount, sign)
+        if day:
+            if day not in self.by_day:
+                insort(self.days, day)
+            _bump(self.by_day, day, sign * amount, sign)
+            if day not in self.by_day:
+                del self.days[bisect_left(self.days, day)]
+            month = month_key(day)
+            _bump(self.by_month, month, sign * amount, sign)
+            _bump(self.by_month_category, (month, cat_id), sign * amount, sign)
+
+    def remove(self, cat_id, amount, day):
+        self.add(cat_id, amount, day, sign=-1)
+
+    def add_entry(self, entry, sign=1):
+        self.add(
+            category_id(entry.get("category", "Без категорії")),
+            float(entry.get("amount", 0)),
+            entry_day(entry)[0],
+            sign
+        )
+
+    @classmethod
+    def rebuild(cls, ledger):
+        totals = cls()
+        for cat_id, amount, day in zip(ledger.cats, ledger.amounts, ledger.days):
+            totals.add(cat_id, amount, day)
+        return totals
+
+    def copy(self):
+        totals = Totals()
+        totals.count = self.count
+        totals.total = self.total
+        for name in ("by_category", "positive_by_category", "by_day", "by_month", "by_month_category"):
+            setattr(totals, name, {k: v[:] for k, v in getattr(self, name).items()})
+        totals.days = self.days[:]
+        return totals
+
+    def same_as(self, other, tolerance=1e-6):
+        if self.count != other.count or abs(self.total - other.total) > tolerance:
+            return False
+        for name in ("by_category", "positive_by_category", "by_day", "by_month", "by_month_category"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if mine.keys() != theirs.keys():
+                return False
+            if any(mine[k][1] != theirs[k][1] or abs(mine[k][0] - theirs[k][0]) > tolerance for k in mine):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    def sum_by_category(self, positive_only=False):
+        sums = self.positive_by_category if positive_only else self.by_category
+        return {_category_names[c]: item[0] for c, item in sums.items()}
+
+    def categories(self):
+        return sorted(_category_names[c] for c in self.by_category)
+
+    def day_total(self, day):
+        item = self.by_day.get(day.toordinal())
+        return item[0] if item else 0.0
+
+    def range_total(self, date_from, date_to):
+        # O(log d + k): k — кількість днів із записами в періоді
+        start = bisect_left(self.days, date_from.toordinal())
+        stop = bisect_right(self.days, date_to.toordinal())
+        by_day = self.by_day
+        return sum(by_day[d][0] for d in self.days[start:stop])
+
+    def daily(self, date_from, date_to):
+        # [(ординал дня, сума)] лише для днів із записами, за зростанням
+        start = bisect_left(self.days, date_from.toordinal())
+        stop = bisect_right(self.days, date_to.toordinal())
+        by_day = self.by_day
+        return [(d, by_day[d][0]) for d in self.days[start:stop]]
+
+    def month_total(self, year, month):
+        item = self.by_month.get(year * 12 + month - 1)
+        return item[0] if item else 0.0
+
+    def monthly(self, first_month, last_month):
+        # {місяць: {категорія: сума}} для місяців first_month..last_month (ключі як у month_key)
+        rollups = {}
+        for (month, cat_id), item in self.by_month_category.items():
+            if first_month <= month <= last_month:
+                rollups.setdefault(month, {})[_category_names[cat_id]] = item[0]
+        return rollups
+
+
+class Entry:
+    # перегляд одного рядка для коду, якому потрібен доступ як до запису: e["amount"], e.date
+    __slots__ = ("ledger", "index")
+
+    def __init__(self, ledger, index):
+        self.ledger = ledger
+        self.index = index
+
+    @property
+    def id(self):
+        return f"{self.ledger.ids[self.index]:010x}"
+
+    @property
+    def category(self):
+        return _category_names[self.ledger.cats[self.index]]
+
+    @property
+    def amount(self):
+        return self.ledger.amounts[self.index]
+
+    @property
+    def day(self):
+        return self.ledger.days[self.index]
+
+    @property
+    def date(self):
+        day = self.ledger.days[self.index]
+        if day:
+            return format_day(day)
+        return self.ledger.raw_dates.get(self.ledger.ids[self.index], "")
+
+    def __getitem__(self, key):
+        if key not in ("id", "category", "amount", "date", "day"):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_record(self):
+        # як запис зберігається на диску: дата — ординал, рядок лишається тільки для нерозібраних дат
+        record = {"id": self.id, "category": self.category, "amount": self.amount, "day": self.day}
+        if not record["day"]:
+            record["date"] = self.date
+        return record
+
+    def to_dict(self):
+        # для показу: ще й "date" у вигляді ДД/ММ/РРРР
+        return {"id": self.id, "category": self.category, "amount": self.amount, "day": self.day, "date": self.date}
+
+
+class Ledger:
+    __slots__ = ("ids", "amounts", "days", "cats", "seqs", "index_ids", "index_pos", "next_seq", "raw_dates", "totals")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.amounts = array("d")
+        self.days = array("l")
+        self.cats = array("I")
+        self.seqs = array("q")
+        # індекс за id будується при першому пошуку: відсортовані id і день << 32 | seq для них
+        self.index_ids = None
+        self.index_pos = None
+        self.next_seq = 0
+        self.raw_dates = {}  # id -> рядок дати, яку не вдалося розібрати (зберігаємо як було)
+        self.totals = Totals()
+
+    @classmethod
+    def from_entries(cls, entries):
+        ledger = cls()
+        for e in entries:
+            ledger.append(e)
+        return ledger
+
+    @classmethod
+    def from_rows(cls, rows):
+        # рядки (entry_id, category, amount, day, date) з SQLite
+        ledger = cls()
+        for entry_id, category, amount, day, date_str in rows:
+            ledger._append(int(entry_id, 16), category_id(category), float(amount), day or 0, date_str)
+        return ledger
+
+    def copy(self):
+        ledger = Ledger()
+        ledger.ids = self.ids[:]
+        ledger.amounts = self.amounts[:]
+        ledger.days = self.days[:]
+        ledger.cats = self.cats[:]
+        ledger.seqs = self.seqs[:]
+        ledger.next_seq = self.next_seq  # індекс копія збудує сама, якщо в ній щось шукатимуть
+        ledger.raw_dates = dict(self.raw_dates)
+        ledger.totals = self.totals.copy()
+        return ledger
+
+    def rebuild_totals(self):
+        # перерахунок з нуля; повертає False, якщо накопичені підсумки розійшлися з даними
+        fresh = Totals.rebuild(self)
+        consistent = fresh.same_as(self.totals)
+        self.totals = fresh
+        return consistent
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (Entry(self, i) for i in range(len(self.ids)))
+
+    def _append(self, packed_id, cat_id, amount, day, date_str):
+        # найчастіше запис найновіший і просто дописується в кінець
+        seq = self.next_seq
+        self.next_seq += 1
+        if not self.days or self.days[-1] <= day:
+            self.ids.append(packed_id)
+            self.cats.append(cat_id)
+            self.amounts.append(amount)
+            self.days.append(day)
+            self.seqs.append(seq)
+        else:
+            index = bisect_right(self.days, day)
+            self.ids.insert(index, packed_id)
+            self.cats.insert(index, cat_id)
+            self.amounts.insert(index, amount)
+            self.days.insert(index, day)
+            self.seqs.insert(index, seq)
+        if self.index_ids is not None:
+            i = bisect_left(self.index_ids, packed_id)
+            self.index_ids.insert(i, packed_id)
+            self.index_pos.insert(i, day << 32 | seq)
+        if not day and date_str:
+            self.raw_dates[packed_id] = date_str
+        self.totals.add(cat_id, amount, day)
+
+    def append(self, entry):
+        day, raw = entry_day(entry)
+        self._append(
+            int(entry.get("id") or new_entry_id(), 16),
+            category_id(entry.get("category", "Без категорії")),
+            float(entry.get("amount", 0)),
+            day,
+            raw
+        )
+
+    def _build_index(self):
+        ids, days, seqs = self.ids, self.days, self.seqs
+        order = sorted(range(len(ids)), key=ids.__getitem__)
+        self.index_ids = array("q", [ids[i] for i in order])
+        self.index_pos = array("q", [days[i] << 32 | seqs[i] for i in order])
+
+    def _index(self, entry_id):
+        if not is_entry_id(entry_id):
+            return None
+        if self.index_ids is None:
+            self._build_index()
+        packed_id = int(entry_id, 16)
+        i = bisect_left(self.index_ids, packed_id)
+        if i == len(self.index_ids) or self.index_ids[i] != packed_id:
+            return None
+        position = self.index_pos[i]
+        day, seq = position >> 32, position & 0xFFFFFFFF
+        lo = bisect_left(self.days, day)
+        hi = bisect_right(self.days, day, lo)
+        index = bisect_left(self.seqs, seq, lo, hi)
+        return index if index < hi and self.seqs[index] == seq else None
+
+    def get(self, entry_id):
+        index = self._index(entry_id)
+        return None if index is None else Entry(self, index)
+
+    def update(self, entry_id, changes):
+        index = self._index(entry_id)
+        if index is None:
+            return
+        if "day" in changes or "date" in changes:
+            # нова дата — рядок переїжджає на своє місце у впорядкованих колонках
+            entry = self.get(entry_id).to_record()
+            entry.pop("date", None)
+            if "day" not in changes:
+                entry.pop("day", None)  # правка лише з "date" (журнали до ординалів) — стара "day" не має перемагати
+            entry.update(changes)
+            self.delete(entry_id)
+            self.append(entry)
+            return
+        self.totals.remove(self.cats[index], self.amounts[index], self.days[index])
+        if "category" in changes:
+            self.cats[index] = category_id(changes["category"])
+        if "amount" in changes:
+            self.amounts[index] = float(changes["amount"])
+        self.totals.add(self.cats[index], self.amounts[index], self.days[index])
+
+    def delete(self, entry_id):
+        index = self._index(entry_id)
+        if index is None:
+            return
+        self.raw_dates.pop(self.ids[index], None)
+        i = bisect_left(self.index_ids, self.ids[index])  # індекс уже є: його збудував _index
+        del self.index_ids[i]
+        del self.index_pos[i]
+        self.totals.remove(self.cats[index], self.amounts[index], self.days[index])
+        del self.ids[index]
+        del self.cats[index]
+        del self.amounts[index]
+        del self.days[index]
+        del self.seqs[index]
+
+    def apply_ops(self, ops):
+        # ті самі операції, що й у журналі: ("add", entry), ("update", id, changes), ("delete", id)
+        # повторне додавання того самого id (перезапис після збою) нічого не змінює
+        for op in ops:
+            if op[0] == "add":
+                if self._index(op[1].get("id")) is None:
+                    self.append(op[1])
+            elif op[0] == "update":
+                self.update(op[1], op[2])
+            elif op[0] == "delete":
+                self.delete(op[1])
+        return self
+
+    def to_dicts(self):
+        return [e.to_dict() for e in self]
+
+    def to_records(self):
+        return [e.to_record() for e in self]
+
+    # --- вибірки й агрегати прямо по колонках ---
+    def span(self, date_from=None, date_to=None):
+        # межі [start, stop) рядків періоду; без меж — усі рядки, з межами — без нерозібраних дат
+        if date_from is None and date_to is None:
+            return 0, len(self.days)
+        start = bisect_left(self.days, date_from.toordinal() if date_from is not None else 1)
+        stop = bisect_right(self.days, date_to.toordinal()) if date_to is not None else len(self.days)
+        return start, max(start, stop)
+
+    def rows(self, category=None, date_from=None, date_to=None):
+        cat_id = None if category is None else _category_ids.get(category)
+        if category is not None and cat_id is None:
+            return []
+        start, stop = self.span(date_from, date_to)
+        return [
+            Entry(self, i) for i in range(start, stop)
+            if cat_id is None or self.cats[i] == cat_id
+        ]
+
+    def find(self, category=None, date_from=None, date_to=None):
+        return [e.to_dict() for e in self.rows(category, date_from, date_to)]
+
+    def row_tuples(self, start, stop):
+        # [(ординал, категорія, сума)] для рядків start..stop — без словників на кожен запис
+        return list(zip(
+            self.days[start:stop],
+            [_category_names[c] for c in self.cats[start:stop]],
+            self.amounts[start:stop]
+        ))
+
+    def categories(self):
+        return sorted({_category_names[c] for c in set(self.cats)})
+
+    def sum_by_category(self, date_from=None, date_to=None, positive_only=False):
+        # категорії в порядку першої появи, як у звітах раніше
+        start, stop = self.span(date_from, date_to)
+        sums = engine.sum_by_category(self, start, stop, positive_only)
+        return {_category_names[c]: total for c, total in sums.items()}
+
+    def bucket_totals(self, period="day", date_from=None, date_to=None):
+        # {дата початку дня/тижня/місяця/року: сума} за зростанням дат
+        start, stop = self.span(date_from, date_to)
+        sums = engine.bucket_totals(self, start, stop, period)
+        return {date.fromordinal(d): total for d, total in sums.items()}
+
+    def top_categories(self, n, date_from=None, date_to=None, positive_only=False):
+        return engine.top_n(self.sum_by_category(date_from, date_to, positive_only), n)
+
+    def total(self, date_from=None, date_to=None, positive_only=False):
+        if not positive_only:
+            start, stop = self.span(date_from, date_to)
+            return sum(self.amounts[start:stop])
+        return sum(self.sum_by_category(date_from, date_to, positive_only).values())
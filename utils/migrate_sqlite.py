@@ -0,0 +1,40 @@
+# Одноразове перенесення даних з data/*.json у SQLite.
+# Запуск: python -m utils.migrate_sqlite [шлях_до_бази]
+# Після цього встановіть STORAGE_BACKEND=sqlite у .env.
+import os
+import sys
+
+from utils.helpers import (
+    ensure_files, SQLITE_FILE,
+    EXPENSES_FILE, INCOME_FILE, CATEGORIES_FILE, INCOME_CATEGORIES_FILE, SETTINGS_FILE, AUTO_INCOME_FILE
+)
+from utils.json_store import JsonBackend
+from utils.sqlite_store import SqliteBackend
+
+MIGRATED_FILES = [
+    EXPENSES_FILE, INCOME_FILE, CATEGORIES_FILE, INCOME_CATEGORIES_FILE, SETTINGS_FILE, AUTO_INCOME_FILE
+]
+
+
+def migrate_json_to_sqlite(db_path=SQLITE_FILE):
+    ensure_files()
+    source = JsonBackend()
+    backend = SqliteBackend(db_path)
+    counts = {}
+    try:
+        for file_path in MIGRATED_FILES:
+            if file_path not in (EXPENSES_FILE, INCOME_FILE) and not os.path.exists(file_path):
+                continue
+            users = source.iter_users(file_path)
+            for user_id, value in users:
+                backend.set_user_data(file_path, user_id, value)
+            counts[file_path] = len(users)
+    finally:
+        backend.close()
+    return counts
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else SQLITE_FILE
+    for file_path, users in migrate_json_to_sqlite(db_path).items():
+        print(f"✅ {file_path}: {users} користувачів → {db_path}")
@@ -0,0 +1,409 @@
+# Кільцева діаграма без matplotlib: лише struct і zlib.
+# Кільце заливається горизонтальними відрізками (межі секторів — бінарним пошуком по рядку),
+# текст — гліфами з fonts/DejaVuSans.ttf, які розбираються й растеризуються тут же
+# зі згладжуванням. На виході — той самий PNG, що й у matplotlib-версії, лише простіший:
+# відсотки на кільці, підписи — легендою під ним.
+import math
+import struct
+import zlib
+from functools import lru_cache
+
+FONT_PATH = "fonts/DejaVuSans.ttf"
+
+# палітра Set3, як у matplotlib-версії
+COLORS = (
+    b"\x8d\xd3\xc7", b"\xff\xff\xb3", b"\xbe\xba\xda", b"\xfb\x80\x72",
+    b"\x80\xb1\xd3", b"\xfd\xb4\x62", b"\xb3\xde\x69", b"\xfc\xcd\xe5",
+    b"\xd9\xd9\xd9", b"\xbc\x80\xbd", b"\xcc\xeb\xc5", b"\xff\xed\x6f",
+)
+WHITE = b"\xff\xff\xff"
+BLACK = b"\x00\x00\x00"
+
+WIDTH = 600
+RADIUS = 190
+HOLE = 0.55  # внутрішній радіус відносно зовнішнього
+LEGEND_ROW = 26
+
+
+# --- шрифт TrueType: cmap (формат 4), loca/glyf, hmtx ---
+class Font:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = data = f.read()
+        self.tables = {}
+        for i in range(struct.unpack_from(">H", data, 4)[0]):
+            tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * i)
+            self.tables[tag.decode("latin-1")] = offset
+        head = self.tables["head"]
+        self.units = struct.unpack_from(">H", data, head + 18)[0]
+        self.long_loca = struct.unpack_from(">h", data, head + 50)[0] == 1
+        hhea = self.tables["hhea"]
+        self.ascender, self.descender = struct.unpack_from(">hh", data, hhea + 4)
+        self.metrics_count = struct.unpack_from(">H", data, hhea + 34)[0]
+        self.glyph_count = struct.unpack_from(">H", data, self.tables["maxp"] + 4)[0]
+        self._cmap = self._read_cmap()
+
+    def _read_cmap(self):
+        data, base = self.data, self.tables["cmap"]
+        for i in range(struct.unpack_from(">H", data, base + 2)[0]):
+            platform, encoding, offset = struct.unpack_from(">HHI", data, base + 4 + 8 * i)
+            if (platform, encoding) in ((3, 1), (0, 3)) and struct.unpack_from(">H", data, base + offset)[0] == 4:
+                return base + offset
+        raise ValueError("У шрифті немає таблиці cmap формату 4")
+
+    @lru_cache(maxsize=1024)
+    def glyph_id(self, char):
+        code = ord(char)
+        if code > 0xFFFF:
+            return 0
+        data, sub = self.data, self._cmap
+        segments = struct.unpack_from(">H", data, sub + 6)[0] // 2
+        ends = sub + 14
+        starts = ends + 2 * segments + 2
+        deltas = starts + 2 * segments
+        ranges = deltas + 2 * segments
+        for i in range(segments):
+            if struct.unpack_from(">H", data, ends + 2 * i)[0] >= code:
+                break
+        start = struct.unpack_from(">H", data, starts + 2 * i)[0]
+        if start > code:
+            return 0
+        delta = struct.unpack_from(">h", data, deltas + 2 * i)[0]
+        range_offset = struct.unpack_from(">H", data, ranges + 2 * i)[0]
+        if range_offset == 0:
+            return (code + delta) & 0xFFFF
+        glyph = struct.unpack_from(">H", data, ranges + 2 * i + range_offset + 2 * (code - start))[0]
+        return (glyph + delta) & 0xFFFF if glyph else 0
+
+    def advance(self, glyph):
+        index = min(glyph, self.metrics_count - 1)
+        return struct.unpack_from(">H", self.data, self.tables["hmtx"] + 4 * index)[0]
+
+    def _glyph_range(self, glyph):
+        loca = self.tables["loca"]
+        if self.long_loca:
+            start, end = struct.unpack_from(">II", self.data, loca + 4 * glyph)
+        else:
+            start, end = (2 * v for v in struct.unpack_from(">HH", self.data, loca + 2 * glyph))
+        return self.tables["glyf"] + start, end - start
+
+    def contours(self, glyph, depth=0):
+        # контури гліфа: списки точок (x, y, на кривій) в одиницях шрифту
+        if glyph >= self.glyph_count or depth > 8:
+            return []
+        offset, length = self._glyph_range(glyph)
+        if not length:
+            return []
+        data = self.data
+        count = struct.unpack_from(">h", data, offset)[0]
+        if count < 0:
+            return self._composite(offset + 10, depth)
+
+        ends = struct.unpack_from(f">{count}H", data, offset + 10)
+        pos = offset + 10 + 2 * count
+        pos += 2 + struct.unpack_from(">H", data, pos)[0]  # інструкції пропускаємо
+        total = ends[-1] + 1 if ends else 0
+        flags = []
+        while len(flags) < total:
+            flag = data[pos]
+            pos += 1
+            flags.append(flag)
+            if flag & 8:
+                flags.extend([flag] * data[pos])
+                pos += 1
+        coords = []
+        for short, same in ((2, 16), (4, 32)):
+            value, values = 0, []
+            for flag in flags:
+                if flag & short:
+                    delta = data[pos]
+                    pos += 1
+                    value += delta if flag & same else -delta
+                elif not flag & same:
+                    value += struct.unpack_from(">h", data, pos)[0]
+                    pos += 2
+                values.append(value)
+            coords.append(values)
+        xs, ys = coords
+        contours, first = [], 0
+        for end in ends:
+            contours.append([(xs[i], ys[i], flags[i] & 1) for i in range(first, end + 1)])
+            first = end + 1
+        return contours
+
+    def _composite(self, pos, depth):
+        data, contours = self.data, []
+        while True:
+            flags, glyph = struct.unpack_from(">HH", data, pos)
+            pos += 4
+            if flags & 1:
+                dx, dy = struct.unpack_from(">hh", data, pos)
+                pos += 4
+            else:
+                dx, dy = struct.unpack_from(">bb", data, pos)
+                pos += 2
+            if not flags & 2:
+                dx = dy = 0  # прив'язка за точками трапляється рідко — ігноруємо
+            a, b, c, d = 1.0, 0.0, 0.0, 1.0
+            if flags & 8:
+                a = d = struct.unpack_from(">h", data, pos)[0] / 16384
+                pos += 2
+            elif flags & 0x40:
+                a, d = (v / 16384 for v in struct.unpack_from(">hh", data, pos))
+                pos += 4
+            elif flags & 0x80:
+                a, b, c, d = (v / 16384 for v in struct.unpack_from(">hhhh", data, pos))
+                pos += 8
+            for contour in self.contours(glyph, depth + 1):
+                contours.append([(a * x + c * y + dx, b * x + d * y + dy, on) for x, y, on in contour])
+            if not flags & 0x20:
+                return contours
+
+
+def _flatten(contour, steps=4):
+    # квадратичні криві -> ламана
+    n = len(contour)
+    start = next((i for i in range(n) if contour[i][2]), None)
+    if start is None:  # лише контрольні точки: початок — середина першої пари
+        x0 = (contour[0][0] + contour[1][0]) / 2
+        y0 = (contour[0][1] + contour[1][1]) / 2
+        contour = [(x0, y0, 1)] + contour[1:] + contour[:1]
+        n, start = len(contour), 0
+    points = [contour[(start + i) % n] for i in range(n)] + [contour[start]]
+    line = [points[0][:2]]
+    control = None
+    for x, y, on in points[1:]:
+        if on:
+            if control is None:
+                line.append((x, y))
+            else:
+                line.extend(_curve(line[-1], control, (x, y), steps))
+                control = None
+        elif control is None:
+            control = (x, y)
+        else:
+            mid = ((control[0] + x) / 2, (control[1] + y) / 2)
+            line.extend(_curve(line[-1], control, mid, steps))
+            control = (x, y)
+    return line
+
+
+def _curve(p0, p1, p2, steps):
+    out = []
+    for i in range(1, steps + 1):
+        t = i / steps
+        u = 1 - t
+        out.append((u * u * p0[0] + 2 * u * t * p1[0] + t * t * p2[0],
+                    u * u * p0[1] + 2 * u * t * p1[1] + t * t * p2[1]))
+    return out
+
+
+@lru_cache(maxsize=1)
+def _font():
+    return Font(FONT_PATH)
+
+
+@lru_cache(maxsize=2048)
+def _glyph_bitmap(glyph, size):
+    # (ширина, висота, зсув ліворуч, верх над базовою лінією, прозорість 0..255 по пікселях)
+    font = _font()
+    scale = size / font.units
+    edges = []
+    for contour in font.contours(glyph):
+        line = [(x * scale, -y * scale) for x, y in _flatten(contour)]
+        for (x0, y0), (x1, y1) in zip(line, line[1:]):
+            if y0 != y1:
+                edges.append((x0, y0, x1, y1))
+    if not edges:
+        return 0, 0, 0, 0, b""
+    left = math.floor(min(min(e[0], e[2]) for e in edges))
+    top = math.floor(min(min(e[1], e[3]) for e in edges))
+    width = math.ceil(max(max(e[0], e[2]) for e in edges)) - left + 1
+    height = math.ceil(max(max(e[1], e[3]) for e in edges)) - top + 1
+    coverage = [0.0] * (width * height)
+    sub = 4  # підрядків на піксель; по горизонталі покриття рахується точно
+    for row in range(height * sub):
+        y = top + (row + 0.5) / sub
+        crossings = []
+        for x0, y0, x1, y1 in edges:
+            if (y0 <= y < y1) or (y1 <= y < y0):
+                crossings.append((x0 + (y - y0) * (x1 - x0) / (y1 - y0) - left, 1 if y1 > y0 else -1))
+        crossings.sort()
+        base = (row // sub) * width
+        winding = 0
+        for (xa, direction), (xb, _) in zip(crossings, crossings[1:]):
+            winding += direction
+            if winding and xb > xa:
+                _add_span(coverage, base, xa, xb, 1 / sub)
+    return width, height, left, -top, bytes(min(255, int(c * 255 + 0.5)) for c in coverage)
+
+
+def _add_span(coverage, base, xa, xb, weight):
+    ia, ib = int(xa), int(xb)
+    if ia == ib:
+        coverage[base + ia] += (xb - xa) * weight
+        return
+    coverage[base + ia] += (ia + 1 - xa) * weight
+    for i in range(ia + 1, ib):
+        coverage[base + i] += weight
+    if xb > ib:
+        coverage[base + ib] += (xb - ib) * weight
+
+
+# --- полотно RGB ---
+class Canvas:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(WHITE * (width * height))
+
+    def fill_span(self, y, x0, x1, color):
+        x0, x1 = max(0, x0), min(self.width, x1)
+        if x1 > x0:
+            start = (y * self.width + x0) * 3
+            self.pixels[start:start + (x1 - x0) * 3] = color * (x1 - x0)
+
+    def blend(self, x, y, color, alpha):
+        if not (0 <= x < self.width and 0 <= y < self.height) or alpha <= 0:
+            return
+        i = (y * self.width + x) * 3
+        if alpha >= 1:
+            self.pixels[i:i + 3] = color
+            return
+        p = self.pixels
+        for k in range(3):
+            p[i + k] = int(p[i + k] + (color[k] - p[i + k]) * alpha + 0.5)
+
+    def fill_rect(self, x, y, w, h, color):
+        for row in range(max(0, y), min(self.height, y + h)):
+            self.fill_span(row, x, x + w, color)
+
+    def text_width(self, text, size):
+        font = _font()
+        return sum(font.advance(font.glyph_id(ch)) for ch in text) * size / font.units
+
+    def draw_text(self, x, baseline, text, size, color=BLACK):
+        font = _font()
+        scale = size / font.units
+        pen = x
+        for ch in text:
+            glyph = font.glyph_id(ch)
+            width, height, left, top, alpha = _glyph_bitmap(glyph, size)
+            gx, gy = int(round(pen)) + left, baseline - top
+            for row in range(height):
+                for col in range(width):
+                    a = alpha[row * width + col]
+                    if a:
+                        self.blend(gx + col, gy + row, color, a / 255)
+            pen += font.advance(glyph) * scale
+
+    def draw_text_centered(self, cx, baseline, text, size, color=BLACK):
+        self.draw_text(int(cx - self.text_width(text, size) / 2), baseline, text, size, color)
+
+    def png(self):
+        raw = bytearray()
+        stride = self.width * 3
+        for y in range(self.height):
+            raw += b"\x00"
+            raw += self.pixels[y * stride:(y + 1) * stride]
+        return b"".join((
+            b"\x89PNG\r\n\x1a\n",
+            _chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)),
+            _chunk(b"IDAT", zlib.compress(bytes(raw), 6)),
+            _chunk(b"IEND", b""),
+        ))
+
+
+def _chunk(tag, body):
+    return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body))
+
+
+# --- кільце ---
+def _fraction(x, y, cx, cy):
+    # частка кола від верхньої точки проти годинникової стрілки (як startangle=90 у matplotlib)
+    angle = math.atan2(cy - y, x - cx) - math.pi / 2
+    return (angle / (2 * math.pi)) % 1.0
+
+
+def _wedge(bounds, t):
+    for i, bound in enumerate(bounds):
+        if t < bound:
+            return i
+    return len(bounds) - 1
+
+
+def _fill_half(canvas, y, x0, x1, cx, cy, bounds):
+    # у межах половини рядка частка кола монотонна — шукаємо точки зміни сектора
+    if x1 <= x0:
+        return
+    yc = y + 0.5
+    x = x0
+    while x < x1:
+        wedge = _wedge(bounds, _fraction(x + 0.5, yc, cx, cy))
+        lo, hi = x, x1 - 1
+        while lo < hi:  # останній піксель того ж сектора
+            mid = (lo + hi + 1) // 2
+            if _wedge(bounds, _fraction(mid + 0.5, yc, cx, cy)) == wedge:
+                lo = mid
+            else:
+                hi = mid - 1
+        canvas.fill_span(y, x, lo + 1, COLORS[wedge % len(COLORS)])
+        x = lo + 1
+
+
+def _draw_ring(canvas, cx, cy, bounds):
+    inner = RADIUS * HOLE
+    for y in range(max(0, int(cy - RADIUS)), min(canvas.height, int(cy + RADIUS) + 1)):
+        dy = y + 0.5 - cy
+        if abs(dy) >= RADIUS:
+            continue
+        outer_half = math.sqrt(RADIUS * RADIUS - dy * dy)
+        inner_half = math.sqrt(inner * inner - dy * dy) if abs(dy) < inner else 0.0
+        left_out, right_out = cx - outer_half, cx + outer_half
+        left_in, right_in = cx - inner_half, cx + inner_half
+        _fill_half(canvas, y, math.ceil(left_out - 0.5), math.floor(left_in - 0.5) + 1, cx, cy, bounds)
+        _fill_half(canvas, y, math.ceil(right_in - 0.5), math.floor(right_out - 0.5) + 1, cx, cy, bounds)
+        # згладжування країв по горизонталі
+        for edge, x_edge, inside in ((left_out, math.ceil(left_out - 0.5) - 1, 1),
+                                     (right_out, math.floor(right_out - 0.5) + 1, -1)):
+            cover = (x_edge + 1 - edge) if inside > 0 else (edge - x_edge)
+            t = _fraction(x_edge + 0.5, y + 0.5, cx, cy)
+            canvas.blend(x_edge, y, COLORS[_wedge(bounds, t) % len(COLORS)], min(1.0, max(0.0, cover)))
+
+
+def donut_png(data, title):
+    labels = list(data.keys())
+    values = list(data.values())
+    total = sum(values) or 1
+    bounds, acc = [], 0.0
+    for value in values:
+        acc += value / total
+        bounds.append(acc)
+    bounds[-1] = 1.0
+
+    cx, cy = WIDTH / 2, 60 + RADIUS
+    legend_top = int(cy + RADIUS) + 30
+    canvas = Canvas(WIDTH, legend_top + LEGEND_ROW * len(labels) + 10)
+
+    canvas.draw_text_centered(cx, 36, title, 20)
+    _draw_ring(canvas, cx, cy, bounds)
+
+    # відсотки посередині кільця; дрібні сектори — лише в легенді
+    middle = RADIUS * (1 + HOLE) / 2
+    start = 0.0
+    for value, end in zip(values, bounds):
+        if end - start >= 0.04:
+            angle = math.pi / 2 + (start + end) * math.pi
+            tx, ty = cx + middle * math.cos(angle), cy - middle * math.sin(angle)
+            canvas.draw_text_centered(tx, int(ty + 5), f"{value / total * 100:.1f}%", 14)
+        start = end
+
+    for i, (label, value) in enumerate(zip(labels, values)):
+        top = legend_top + i * LEGEND_ROW
+        canvas.fill_rect(40, top, 16, 16, COLORS[i % len(COLORS)])
+        text = f"{label} — {value / total * 100:.1f}%"
+        while len(text) > 1 and canvas.text_width(text, 14) > WIDTH - 80:
+            text = text[:-2] + "…"
+        canvas.draw_text(64, top + 14, text, 14)
+
+    return canvas.png()
@@ -0,0 +1,81 @@
+# Приватні повідомлення про автоматичні записи. Надсилають кілька воркерів з обмеженої
+# черги, зі спільною паузою між надсиланнями, щоб не впиратися в ліміти Discord.
+# Користувач береться з кешу клієнта; REST-запит fetch_user — лише якщо його там немає.
+import asyncio
+
+import discord
+
+from config import NOTIFY_WORKERS, NOTIFY_RATE, NOTIFY_QUEUE
+
+
+class Notifier:
+    def __init__(self, bot, workers=NOTIFY_WORKERS, rate=NOTIFY_RATE, max_queue=NOTIFY_QUEUE):
+        self.bot = bot
+        self.workers = workers
+        self.interval = 1 / rate if rate > 0 else 0
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks = []
+        self._next_send = 0.0
+        self._pending = 0  # у черзі або надсилаються зараз
+        self._stats = {"sent": 0, "failed": 0, "cached": 0, "fetched": 0}
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def stats(self):
+        return {**self._stats, "queued": self.queue.qsize()}
+
+    async def notify(self, user_id, text):
+        # черга обмежена: якщо вона повна, той, хто додає, чекає
+        self._pending += 1
+        await self.queue.put((str(user_id), text))
+
+    async def _pace(self, delay=0.0):
+        # спільний для всіх воркерів розклад: не частіше ніж раз на interval секунд
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_send + delay)
+        self._next_send = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def _worker(self):
+        while True:
+            user_id, text = await self.queue.get()
+            try:
+                await self._send(user_id, text)
+            except Exception as e:
+                self._stats["failed"] += 1
+                print(f"[!] Сповіщення {user_id} не надіслано: {e}")
+            finally:
+                self._pending -= 1
+            if not self._pending:  # черга розібрана — підсумок у лог
+                print(f"[i] Сповіщення: {self.stats()}")
+
+    async def _send(self, user_id, text):
+        user = self.bot.get_user(int(user_id))
+        if user is not None:
+            self._stats["cached"] += 1
+        for attempt in range(2):
+            await self._pace()
+            try:
+                if user is None:
+                    user = await self.bot.fetch_user(int(user_id))
+                    self._stats["fetched"] += 1
+                await user.send(text)
+                self._stats["sent"] += 1
+                return
+            except (discord.Forbidden, discord.NotFound):
+                break  # закриті приватні повідомлення або користувача немає — повтор не допоможе
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt:
+                    raise
+                # discord.py вже повторював запит; відступаємо всією чергою і пробуємо ще раз
+                await self._pace(getattr(e, "retry_after", None) or 5.0)
+        self._stats["failed"] += 1
@@ -0,0 +1,202 @@
+# Збирання PDF у процесі пулу (utils/render_pool.py): на вході прості дані звіту,
+# на виході байти PDF. Шрифт розбирається один раз на процес — кожен документ
+# починається з копії готового шаблону.
+import copy
+import heapq
+import json
+import os
+from io import BytesIO
+
+from utils.chart_render import pie_png
+from utils.dates import format_day
+
+FONT_PATH = "fonts/DejaVuSans.ttf"
+
+_template = None
+_font_bytes = None
+
+
+def _new_pdf():
+    global _template, _font_bytes
+    if _template is None:
+        from fpdf import FPDF
+        _template = FPDF()
+        _template.add_font("DejaVu", "", FONT_PATH, uni=True)
+        with open(FONT_PATH, "rb") as f:
+            _font_bytes = f.read()
+    from fontTools import ttLib
+
+    pdf = copy.deepcopy(_template)
+    # метрики шрифту копія ділить із шаблоном, а сам TTFont fpdf урізає під час output() —
+    # тому кожному документу свій, відкритий ліниво з байтів у пам'яті
+    for font in pdf.fonts.values():
+        font.ttfont = ttLib.TTFont(BytesIO(_font_bytes), recalcTimestamp=False, lazy=True)
+    return pdf
+
+
+def share(part, total):
+    return part / total * 100 if total else 0.0
+
+
+def overall_pdf(report):
+    # report — див. pdf_report.overall_report_data()
+    total_income = report["total_income"]
+    total_expenses = report["total_expenses"]
+    top_income = report["top_income"]
+    top_expense = report["top_expense"]
+
+    pdf = _new_pdf()
+    pdf.add_page()
+    pdf.set_font("DejaVu", size=14)
+    pdf.cell(200, 10, report.get("title", "Загальний фінансовий звіт"), ln=True, align="C")
+    pdf.ln(10)
+
+    pdf.cell(200, 10, f"Загальні прибутоки: {total_income:.2f} UAH", ln=True)
+    pdf.cell(200, 10, f"Загальні витрати: {total_expenses:.2f} UAH", ln=True)
+    pdf.cell(200, 10, f"Залишок: {report['balance']:.2f} UAH", ln=True)
+    pdf.ln(10)
+
+    pdf.set_font("DejaVu", size=12)
+    pdf.cell(200, 10, f"Найбільша категорія прибутку: {top_income[0]} ({share(top_income[1], total_income):.1f}% of income)", ln=True)
+
+    pdf.set_font("DejaVu", size=11)
+    pdf.cell(200, 10, "Категорії прибутків:", ln=True)
+    for category, amount in report["income"]:
+        pdf.cell(200, 8, f"- {category}: {amount:.2f} UAH", ln=True)
+    pdf.ln(5)
+
+    # Charts
+    if report["income_chart"]:
+        pdf.image(BytesIO(pie_png(report["income_chart"], "Діаграма прибутків:")), x=25, y=None, w=150)
+        pdf.ln(5)
+
+    pdf.cell(200, 10, f"Найбільша категорія витрат: {top_expense[0]} ({share(top_expense[1], total_expenses):.1f}% of expenses)", ln=True)
+
+    pdf.set_font("DejaVu", size=11)
+    pdf.cell(200, 10, "Категорії витрат:", ln=True)
+    for category, amount in report["expenses"]:
+        pdf.cell(200, 8, f"- {category}: {amount:.2f} UAH", ln=True)
+    # Expense chart
+    if report["expense_chart"]:
+        pdf.image(BytesIO(pie_png(report["expense_chart"], "Діаграма витрат:")), x=25, y=None, w=150)
+        pdf.ln(5)
+
+    return bytes(pdf.output())
+
+
+# --- Журнал операцій: усі прибутки й витрати за датами, з підсумками по місяцях ---
+# Записи читаються порціями й зливаються з двох відсортованих потоків; документ
+# ділиться на частини по pages_per_part сторінок, кожна пишеться у файл і звільняється,
+# тож пам'ять не залежить від кількості записів.
+PAGE_TOP, PAGE_BOTTOM = 34, 282
+ROW_HEIGHT = 5.5
+COLUMNS = ((15, "Дата"), (42, "Тип"), (70, "Категорія"))
+AMOUNT_RIGHT = 195
+
+
+def _month_label(day):
+    return format_day(day)[3:] if day else "без дати"  # "ММ/РРРР"
+
+
+def _ledger_rows(income_path, expenses_path):
+    # файли зі знімком записів (utils/pdf_report.export_ledger_rows) читаються рядок за рядком —
+    # пам'ять процесу не залежить від кількості записів
+    def stream(path, sign):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                day, category, amount = json.loads(line)
+                yield day, sign, category, amount
+    return heapq.merge(stream(income_path, 1), stream(expenses_path, -1), key=lambda row: row[0])
+
+
+class _LedgerWriter:
+    def __init__(self, out_dir, pages_per_part):
+        self.out_dir = out_dir
+        self.pages_per_part = pages_per_part
+        self.parts = []
+        self.page = 0
+        self.pdf = None
+        self.y = PAGE_BOTTOM
+
+    def _right(self, text, y, size=9):
+        self.pdf.set_font_size(size)
+        self.pdf.text(AMOUNT_RIGHT - self.pdf.get_string_width(text), y, text)
+
+    def _new_page(self):
+        if self.pdf is not None and self.pdf.page >= self.pages_per_part:
+            self._finish_part()
+        if self.pdf is None:
+            self.pdf = _new_pdf()
+            self.pdf.set_auto_page_break(False)
+            self.pdf.set_font("DejaVu", size=9)
+        self.page += 1
+        pdf = self.pdf
+        pdf.add_page()
+        pdf.set_font_size(13)
+        pdf.text(15, 16, "Журнал операцій")
+        self._right(f"стор. {self.page}", 16)
+        pdf.set_font_size(9)
+        for x, title in COLUMNS:
+            pdf.text(x, 28, title)
+        self._right("Сума, UAH", 28)
+        pdf.line(15, 30, AMOUNT_RIGHT, 30)
+        self.y = PAGE_TOP
+
+    def _line(self, height=ROW_HEIGHT):
+        if self.y + height > PAGE_BOTTOM:
+            self._new_page()
+        y = self.y
+        self.y += height
+        return y
+
+    def row(self, day, sign, category, amount):
+        y = self._line()
+        pdf = self.pdf
+        pdf.text(COLUMNS[0][0], y, format_day(day) if day else "—")
+        pdf.text(COLUMNS[1][0], y, "прибуток" if sign > 0 else "витрата")
+        pdf.text(COLUMNS[2][0], y, category[:40])
+        self._right(f"{sign * amount:+.2f}", y)
+
+    def subtotal(self, label, income, expenses):
+        y = self._line(ROW_HEIGHT + 2)
+        self.pdf.line(15, y - 3.5, AMOUNT_RIGHT, y - 3.5)
+        self.pdf.set_font_size(9)
+        self.pdf.text(15, y + 0.5, label)
+        self._right(f"+{income:.2f} / -{expenses:.2f} / баланс {income - expenses:.2f}", y + 0.5)
+        self.y += 2
+
+    def _finish_part(self):
+        path = os.path.join(self.out_dir, f"ledger_{len(self.parts) + 1}.pdf")
+        self.pdf.output(path)
+        self.parts.append(path)
+        self.pdf = None
+
+    def close(self):
+        if self.pdf is None:
+            self._new_page()
+        self._finish_part()
+        return self.parts
+
+
+def ledger_pdf(income_path, expenses_path, out_dir, pages_per_part):
+    # шляхи до готових частин у out_dir
+    writer = _LedgerWriter(out_dir, pages_per_part)
+    month = None
+    month_income = month_expenses = total_income = total_expenses = 0.0
+    for day, sign, category, amount in _ledger_rows(income_path, expenses_path):
+        row_month = _month_label(day)
+        if row_month != month:
+            if month is not None:
+                writer.subtotal(f"Разом за {month}", month_income, month_expenses)
+            month, month_income, month_expenses = row_month, 0.0, 0.0
+        if sign > 0:
+            month_income += amount
+            total_income += amount
+        else:
+            month_expenses += amount
+            total_expenses += amount
+        writer.row(day, sign, category, amount)
+    if month is not None:
+        writer.subtotal(f"Разом за {month}", month_income, month_expenses)
+    writer.subtotal("Усього", total_income, total_expenses)
+    return writer.close()
@@ -1,103 +1,135 @@
-from fpdf import FPDF
+import asyncio
+import json
+import os
+import shutil
+import tempfile
 from discord import File
 from io import BytesIO
-from utils.helpers import load_data, INCOME_FILE, EXPENSES_FILE, CATEGORIES_FILE, AUTO_INCOME_FILE
-import matplotlib.pyplot as plt
-from collections import defaultdict
-
-
-def generate_pie_chart(data_dict, title):
-    labels = list(data_dict.keys())
-    sizes = list(data_dict.values())
-    fig, ax = plt.subplots()
-    ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    plt.title(title)
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    plt.close(fig)
-    buffer.seek(0)
-    return buffer
+from config import LEDGER_PAGES_PER_PART, DISCORD_UPLOAD_LIMIT
+from utils import render_pool
+from utils.async_store import store
+from utils.chart_cache import chart_cache
+from utils.helpers import INCOME_FILE, EXPENSES_FILE, iter_rows
+from utils.pdf_render import overall_pdf, ledger_pdf
+from utils.summary import load_summary
+
+
+def overall_report_data(summary, title=None):
+    # Один підсумок на весь звіт: суми, топ-категорії і діаграми беруться з нього.
+    # Лише прості типи — дані передаються в процес пулу.
+    report = {
+        "total_income": summary.total_income,
+        "total_expenses": summary.total_expenses,
+        "balance": summary.balance,
+        "top_income": list(summary.top_income()),
+        "top_expense": list(summary.top_expense()),
+        "income": list(summary.income.items()),
+        "expenses": list(summary.expenses.items()),
+        "income_chart": summary.income_chart(),
+        "expense_chart": summary.expense_chart(),
+    }
+    if title:
+        report["title"] = title
+    return report
+
+
+async def overall_pdf_bytes(user_id):
+    # той самий стан даних — той самий PDF із кешу
+    user_id = str(user_id)
+    version = (store.version(INCOME_FILE, user_id), store.version(EXPENSES_FILE, user_id))
+    pdf = chart_cache.get(user_id, "pdf:overall", version)
+    if pdf is None:
+        report = overall_report_data(await load_summary(user_id))
+        pdf = await render_pool.run(overall_pdf, report)
+        chart_cache.put(user_id, "pdf:overall", version, pdf)
+    return pdf
 
 
 async def send_overall_pdf_report(interaction):
-    user_id = str(interaction.user.id)
-
-    # Load data
-    income_data = load_data(INCOME_FILE).get(user_id, [])
-    auto_income_data = load_data(AUTO_INCOME_FILE).get(user_id, [])
-    expense_data = load_data(EXPENSES_FILE).get(user_id, [])
-
-    # Income summary (manual + auto)
-    income_summary = defaultdict(float)
-    total_income = 0
-    for entry in income_data + auto_income_data:
-        amount = entry.get("amount", 0)
-        category = entry.get("category", "Unknown")
-        if amount > 0:
-            income_summary[category] += amount
-            total_income += amount
-
-    # Expense summary
-    expense_summary = defaultdict(float)
-    total_expenses = 0
-    for entry in expense_data:
-        amount = entry["amount"]
-        if amount > 0:
-            expense_summary[entry["category"]] += amount
-            total_expenses += amount
-
-    # Top categories
-    top_income = max(income_summary.items(), key=lambda x: x[1], default=("None", 0))
-    top_expense = max(expense_summary.items(), key=lambda x: x[1], default=("None", 0))
-    balance = total_income - total_expenses
-
-    # PDF setup
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.add_font("DejaVu", "", "fonts/DejaVuSans.ttf", uni=True)
-    pdf.set_font("DejaVu", size=14)
-    pdf.cell(200, 10, "Загальний фінансовий звіт", ln=True, align="C")
-    pdf.ln(10)
-
-    pdf.cell(200, 10, f"Загальні прибутоки: {total_income:.2f} UAH", ln=True)
-    pdf.cell(200, 10, f"Загальні витрати: {total_expenses:.2f} UAH", ln=True)
-    pdf.cell(200, 10, f"Залишок: {balance:.2f} UAH", ln=True)
-    pdf.ln(10)
-
-    pdf.set_font("DejaVu", size=12)
-    pdf.cell(200, 10, f"Найбільша категорія прибутку: {top_income[0]} ({top_income[1] / total_income * 100:.1f}% of income)", ln=True)
-    
-    pdf.set_font("DejaVu", size=11)
-    pdf.cell(200, 10, "Категорії прибутків:", ln=True)
-    for category, amount in income_summary.items():
-        pdf.cell(200, 8, f"- {category}: {amount:.2f} UAH", ln=True)
-    pdf.ln(5)
-    
-    # Charts
-    income_chart = generate_pie_chart(income_summary, "Діаграма прибутків:")
-
-    pdf.image(income_chart, x=25, y=None, w=150)
-    pdf.ln(5)
-
-    pdf.cell(200, 10, f"Найбільша категорія витрат: {top_expense[0]} ({top_expense[1] / total_expenses * 100:.1f}% of expenses)", ln=True)
-    
-    pdf.set_font("DejaVu", size=11)
-    pdf.cell(200, 10, "Категорії витрат:", ln=True)
-    for category, amount in expense_summary.items():
-        pdf.cell(200, 8, f"- {category}: {amount:.2f} UAH", ln=True)
-    expense_chart = generate_pie_chart(expense_summary, "Діаграма витрат:")
-    # Expense chart
-    pdf.image(expense_chart, x=25, y=None, w=150)
-    pdf.ln(5)
-
-
-    # Finalize PDF
-    buffer = BytesIO(pdf.output(dest='S'))
-    buffer.seek(0)
-
-    await interaction.response.send_message(
+    # відповідь відкладається одразу: збирання PDF може тривати довше за 3 секунди
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    try:
+        pdf = await overall_pdf_bytes(interaction.user.id)
+    except Exception as e:
+        print(f"[!] Не вдалося зібрати PDF-звіт: {e}")
+        await interaction.followup.send("❌ Не вдалося зібрати звіт, спробуйте пізніше.", ephemeral=True)
+        return
+
+    await interaction.followup.send(
         content="Тут ваш звіт у PDF форматі:",
-        file=File(fp=buffer, filename="finance_report.pdf"),
+        file=File(fp=BytesIO(pdf), filename="finance_report.pdf"),
         ephemeral=True
     )
+
+
+def attachment_batches(paths, limit=DISCORD_UPLOAD_LIMIT, max_files=10):
+    # групує файли в повідомлення: до 10 вкладень і не більше limit байтів разом;
+    # файл, більший за ліміт, повертається окремо в oversized
+    batches, oversized = [], []
+    current, size = [], 0
+    for path in paths:
+        file_size = os.path.getsize(path)
+        if file_size > limit:
+            oversized.append(path)
+            continue
+        if current and (size + file_size > limit or len(current) == max_files):
+            batches.append(current)
+            current, size = [], 0
+        current.append(path)
+        size += file_size
+    if current:
+        batches.append(current)
+    return batches, oversized
+
+
+def export_ledger_rows(user_id, out_dir):
+    # Знімок записів для процесу пулу. Робиться тут, у процесі бота: JSON-бекенд копіює колонки
+    # під тим самим локом, що й ущільнення журналів, тож читання не перетинається з ним.
+    # Копія колонок — ~30 байт на запис лише на час запису файлів; рядки пишуться порціями,
+    # а процес пулу читає файли потоково.
+    paths = []
+    for file_path, name in ((INCOME_FILE, "income"), (EXPENSES_FILE, "expenses")):
+        path = os.path.join(out_dir, f"{name}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for chunk in iter_rows(file_path, user_id):
+                f.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in chunk)
+        paths.append(path)
+    return paths
+
+
+async def send_ledger_pdf_report(interaction):
+    # повний журнал операцій; для великих журналів — кількома файлами
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    user_id = str(interaction.user.id)
+    # знімок береться прямо зі сховища — спершу дописуємо чергу
+    await store.flush(INCOME_FILE)
+    await store.flush(EXPENSES_FILE)
+
+    out_dir = tempfile.mkdtemp(prefix="ledger_")
+    try:
+        try:
+            income_path, expenses_path = await asyncio.to_thread(export_ledger_rows, user_id, out_dir)
+            parts = await render_pool.run(ledger_pdf, income_path, expenses_path, out_dir, LEDGER_PAGES_PER_PART)
+        except Exception as e:
+            print(f"[!] Не вдалося зібрати PDF-журнал: {e}")
+            await interaction.followup.send("❌ Не вдалося зібрати журнал, спробуйте пізніше.", ephemeral=True)
+            return
+        batches, oversized = attachment_batches(parts)
+        names = {
+            path: "finance_ledger.pdf" if len(parts) == 1 else f"finance_ledger_{i}_of_{len(parts)}.pdf"
+            for i, path in enumerate(parts, 1)
+        }
+        for n, batch in enumerate(batches):
+            content = "Тут ваш журнал операцій у PDF:" if n == 0 else None
+            await interaction.followup.send(
+                content=content,
+                files=[File(path, filename=names[path]) for path in batch],
+                ephemeral=True
+            )
+        if oversized:
+            await interaction.followup.send(
+                f"⚠️ {len(oversized)} частин(и) журналу перевищують ліміт вкладень Discord і не надіслані.",
+                ephemeral=True
+            )
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
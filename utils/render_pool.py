@@ -0,0 +1,89 @@
+# Пул процесів для малювання: події бота не чекають на matplotlib, а pyplot
+# з його глобальним станом живе в кожному процесі окремо.
+# Одночасно виконується не більше RENDER_WORKERS задач, решта чекає в черзі.
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import RENDER_WORKERS
+from utils import chart_render
+
+_executor = None
+_slots = None
+_stats = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn, а не fork: процес бота має потоки сховища й цикл подій
+        _executor = ProcessPoolExecutor(
+            max_workers=RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=chart_render.warm_up
+        )
+    return _executor
+
+
+def _reset(broken):
+    # процес пулу впав (наприклад, OOM) — зламаний пул більше нічого не виконає, збираємо новий
+    global _executor
+    if _executor is broken:
+        broken.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _submit(func, *args):
+    # одна повторна спроба на новому пулі; задача, що валить процес і вдруге, — помилка
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = _get_executor()
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            _reset(executor)
+            if attempt:
+                raise
+            print("[!] Пул малювання зламався — перезапуск і повтор задачі")
+
+
+async def run(func, *args):
+    # func — функція рівня модуля, args — прості дані (передаються в інший процес)
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(RENDER_WORKERS)
+    _stats["queued"] += 1
+    waiting = True
+    try:
+        async with _slots:
+            _stats["queued"] -= 1
+            waiting = False
+            _stats["running"] += 1
+            try:
+                result = await _submit(func, *args)
+            finally:
+                _stats["running"] -= 1
+    except Exception:
+        _stats["failed"] += 1
+        raise
+    finally:
+        if waiting:  # скасовано ще в черзі
+            _stats["queued"] -= 1
+    _stats["done"] += 1
+    return result
+
+
+def queue_depth():
+    return _stats["queued"]
+
+
+def stats():
+    return dict(_stats)
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,421 @@
+import json
+import sqlite3
+import threading
+
+from utils.dates import parse_day, format_day
+from utils.helpers import LEDGER_FILES, file_key, new_entry_id
+from utils.ledger import Ledger, category_id, entry_day
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    date TEXT NOT NULL,
+    day INTEGER,
+    entry_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS income (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    date TEXT NOT NULL,
+    day INTEGER,
+    entry_id TEXT
+);
+
+-- місячні підсумки user × місяць × категорія; підтримуються тригерами нижче
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+    kind TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    month INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    entries INTEGER NOT NULL,
+    PRIMARY KEY (kind, user_id, month, category)
+);
+
+-- categories, income_categories, settings, auto_income: одне JSON-значення на користувача
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, user_id)
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_expenses_user_day ON expenses (user_id, day);
+CREATE INDEX IF NOT EXISTS idx_expenses_user_category ON expenses (user_id, category);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_user_entry ON expenses (user_id, entry_id);
+CREATE INDEX IF NOT EXISTS idx_income_user_day ON income (user_id, day);
+CREATE INDEX IF NOT EXISTS idx_income_user_category ON income (user_id, category);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_income_user_entry ON income (user_id, entry_id);
+"""
+
+COLUMNS = "entry_id, category, amount, day, date"
+
+# PRAGMA user_version: 1 — колонка date містить канонічний ДД/ММ/РРРР, узгоджений з day
+SCHEMA_VERSION = 1
+
+# ординал дати -> рік * 12 + місяць - 1 (як ledger.month_key); julianday(0001-01-01) = 1721425.5
+MONTH_SQL = "(CAST(strftime('%Y', {day} + 1721424.5) AS INTEGER) * 12 + CAST(strftime('%m', {day} + 1721424.5) AS INTEGER) - 1)"
+
+ROLLUP_ADD = """
+    INSERT INTO monthly_rollups (kind, user_id, month, category, amount, entries)
+    SELECT '{table}', NEW.user_id, {month}, NEW.category, NEW.amount, 1 WHERE NEW.day IS NOT NULL
+    ON CONFLICT (kind, user_id, month, category)
+    DO UPDATE SET amount = amount + excluded.amount, entries = entries + 1;
+"""
+
+ROLLUP_REMOVE = """
+    UPDATE monthly_rollups SET amount = amount - OLD.amount, entries = entries - 1
+    WHERE OLD.day IS NOT NULL AND kind = '{table}' AND user_id = OLD.user_id AND month = {month} AND category = OLD.category;
+    DELETE FROM monthly_rollups
+    WHERE kind = '{table}' AND user_id = OLD.user_id AND category = OLD.category AND entries <= 0;
+"""
+
+
+def rollup_triggers(table):
+    add = ROLLUP_ADD.format(table=table, month=MONTH_SQL.format(day="NEW.day"))
+    remove = ROLLUP_REMOVE.format(table=table, month=MONTH_SQL.format(day="OLD.day"))
+    return f"""
+CREATE TRIGGER IF NOT EXISTS {table}_rollup_insert AFTER INSERT ON {table} BEGIN {add} END;
+CREATE TRIGGER IF NOT EXISTS {table}_rollup_delete AFTER DELETE ON {table} BEGIN {remove} END;
+CREATE TRIGGER IF NOT EXISTS {table}_rollup_update AFTER UPDATE ON {table} BEGIN {remove} {add} END;
+"""
+
+
+def _row(row):
+    entry_id, category, amount, day, date = row
+    return {"id": entry_id, "category": category, "amount": amount, "day": day or 0, "date": date}
+
+
+def _dated(entry):
+    # (day, date) для колонок: day — ординал або NULL, date — рядок для показу
+    day, raw = entry_day(entry)
+    return (day, format_day(day)) if day else (None, raw or "")
+
+
+class SqliteBackend:
+    def __init__(self, path):
+        self.path = path
+        # одне з'єднання на процес; доступ серіалізується локом
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self._totals = {}  # (таблиця, user_id) -> Totals, оновлюються разом із записами
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            had_rollups = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_rollups'"
+            ).fetchone()
+            self.conn.executescript(SCHEMA)
+            self._backfill_ids()
+            self.conn.executescript(INDEXES)
+            for table in LEDGER_FILES:
+                self.conn.executescript(rollup_triggers(table))
+            if not had_rollups:
+                self._rebuild_rollups()
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._migrate_dates()
+                self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+
+    def _migrate_dates(self):
+        # одноразово: day з рядка дати через спільний розбір, date — у канонічному вигляді
+        for table in LEDGER_FILES:
+            changed = []
+            for rowid, date_str, day in self.conn.execute(f"SELECT rowid, date, day FROM {table}").fetchall():
+                new_day = parse_day(date_str) or day
+                new_date = format_day(new_day) if new_day else date_str
+                if (new_day, new_date) != (day, date_str):
+                    changed.append((new_day, new_date, rowid))
+            self.conn.executemany(f"UPDATE {table} SET day = ?, date = ? WHERE rowid = ?", changed)
+
+    def _backfill_ids(self):
+        # бази, створені до появи entry_id: додаємо колонку і генеруємо id
+        for table in LEDGER_FILES:
+            columns = [r[1] for r in self.conn.execute(f"PRAGMA table_info({table})")]
+            if "entry_id" not in columns:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN entry_id TEXT")
+            rowids = [r[0] for r in self.conn.execute(f"SELECT rowid FROM {table} WHERE entry_id IS NULL")]
+            self.conn.executemany(
+                f"UPDATE {table} SET entry_id = ? WHERE rowid = ?",
+                [(new_entry_id(), rowid) for rowid in rowids]
+            )
+
+    def _rebuild_rollups(self):
+        self.conn.execute("DELETE FROM monthly_rollups")
+        for table in LEDGER_FILES:
+            self.conn.execute(
+                f"""INSERT INTO monthly_rollups (kind, user_id, month, category, amount, entries)
+                SELECT '{table}', user_id, {MONTH_SQL.format(day="day")} AS month, category, SUM(amount), COUNT(*)
+                FROM {table} WHERE day IS NOT NULL GROUP BY user_id, month, category"""
+            )
+
+    def rebuild_rollups(self):
+        # перерахунок з нуля, для перевірки узгодженості
+        with self.lock, self.conn:
+            self._rebuild_rollups()
+
+    def monthly_rollups(self, file_path, user_id, first_month, last_month):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT month, category, amount FROM monthly_rollups "
+                "WHERE kind = ? AND user_id = ? AND month BETWEEN ? AND ?",
+                (self._ledger(file_path), str(user_id), first_month, last_month)
+            ).fetchall()
+        rollups = {}
+        for month, category, amount in rows:
+            rollups.setdefault(month, {})[category] = amount
+        return rollups
+
+    def migrate_entries(self):
+        pass  # виконується при відкритті бази
+
+    def compact(self):
+        # аналог ущільнення журналу для SQLite — перенесення WAL у основний файл
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+        return 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _ledger(self, file_path):
+        name = file_key(file_path)
+        return name if name in LEDGER_FILES else None
+
+    def get_user_data(self, file_path, user_id, default=None):
+        table = self._ledger(file_path)
+        with self.lock:
+            if table:
+                rows = self.conn.execute(
+                    f"SELECT {COLUMNS} FROM {table} WHERE user_id = ? ORDER BY day, rowid",
+                    (str(user_id),)
+                ).fetchall()
+                if not rows:
+                    return default
+                return [_row(r) for r in rows]
+
+            row = self.conn.execute(
+                "SELECT value FROM documents WHERE name = ? AND user_id = ?",
+                (file_key(file_path), str(user_id))
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_user_data(self, file_path, user_id, value):
+        with self.lock, self.conn:
+            self._set(file_path, user_id, value)
+
+    def _set(self, file_path, user_id, value):
+        table = self._ledger(file_path)
+        if table:
+            self.conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (str(user_id),))
+            self._insert(table, user_id, value)
+            self._totals.pop((table, str(user_id)), None)
+        else:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO documents (name, user_id, value) VALUES (?, ?, ?)",
+                (file_key(file_path), str(user_id), json.dumps(value, ensure_ascii=False))
+            )
+
+    def get_ledger(self, file_path, user_id):
+        with self.lock:
+            rows = self._ledger_rows(file_path, user_id)
+        return Ledger.from_rows(rows)
+
+    def _ledger_rows(self, file_path, user_id):
+        table = self._ledger(file_path)
+        return self.conn.execute(
+            f"SELECT entry_id, category, amount, day, date FROM {table} WHERE user_id = ? ORDER BY day, rowid",
+            (str(user_id),)
+        ).fetchall()
+
+    def iter_rows(self, file_path, user_id, chunk_size=1000):
+        # (ординал, категорія, сума) за датами, порціями. Окреме з'єднання: курсор читає
+        # свій знімок бази й не тримає спільний лок, поки споживач обробляє порцію
+        table = self._ledger(file_path)
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(
+                f"SELECT COALESCE(day, 0), category, amount FROM {table} WHERE user_id = ? ORDER BY day, rowid",
+                (str(user_id),)
+            )
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    def _cached_totals(self, file_path, user_id):
+        # викликається під self.lock
+        key = (self._ledger(file_path), str(user_id))
+        totals = self._totals.get(key)
+        if totals is None:
+            totals = self._totals[key] = Ledger.from_rows(self._ledger_rows(file_path, user_id)).totals
+        return totals
+
+    def get_totals(self, file_path, user_id):
+        with self.lock:
+            return self._cached_totals(file_path, user_id).copy()
+
+    # вузькі запити до підсумків: без копії Totals
+    def category_totals(self, file_path, user_id):
+        with self.lock:
+            return self._cached_totals(file_path, user_id).sum_by_category()
+
+    def daily_totals(self, file_path, user_id, date_from, date_to):
+        with self.lock:
+            return self._cached_totals(file_path, user_id).daily(date_from, date_to)
+
+    def day_total(self, file_path, user_id, day):
+        with self.lock:
+            return self._cached_totals(file_path, user_id).day_total(day)
+
+    def sum_by_category(self, file_path, user_id, date_from=None, date_to=None, cache=True):
+        # cache — для сумісності з JsonBackend: запит іде напряму в базу, нічого не кешується
+        table = self._ledger(file_path)
+        query = f"SELECT category, SUM(amount) FROM {table} WHERE user_id = ? AND day BETWEEN ? AND ?"
+        params = [
+            str(user_id),
+            date_from.toordinal() if date_from is not None else 1,
+            date_to.toordinal() if date_to is not None else 3652059  # date.max
+        ]
+        query += " GROUP BY category ORDER BY MIN(day), MIN(rowid)"
+        with self.lock:
+            return dict(self.conn.execute(query, params).fetchall())
+
+    def get_entry(self, file_path, user_id, entry_id):
+        table = self._ledger(file_path)
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {COLUMNS} FROM {table} WHERE user_id = ? AND entry_id = ?",
+                (str(user_id), entry_id)
+            ).fetchone()
+        return _row(row) if row else None
+
+    def set_many(self, file_path, values):
+        with self.lock, self.conn:
+            for user_id, value in values.items():
+                self._set(file_path, user_id, value)
+
+    def add_entry(self, file_path, user_id, entry):
+        self.add_entries(file_path, user_id, [entry])
+
+    def add_entries(self, file_path, user_id, new_entries):
+        table = self._ledger(file_path)
+        if not table:
+            entries = self.get_user_data(file_path, user_id, [])
+            entries.extend(new_entries)
+            self.set_user_data(file_path, user_id, entries)
+            return
+        for e in new_entries:
+            e.setdefault("id", new_entry_id())
+        self.apply_ops(file_path, user_id, [("add", e) for e in new_entries])
+
+    def apply_ops(self, file_path, user_id, ops):
+        table = self._ledger(file_path)
+        with self.lock:
+            try:
+                with self.conn:
+                    self._apply_ops(table, user_id, ops)
+            except Exception:
+                # транзакцію відкочено, а закешовані підсумки вже змінені — перерахуються з таблиці
+                self._totals.pop((table, str(user_id)), None)
+                raise
+
+    def _apply_ops(self, table, user_id, ops):
+        totals = self._totals.get((table, str(user_id)))
+        for op in ops:
+            if op[0] == "add":
+                # запис із таким id уже є (повтор після збою) — пропускаємо, а не падаємо на UNIQUE
+                if self._insert(table, user_id, [op[1]], ignore=True) and totals is not None:
+                    totals.add_entry(op[1])
+                continue
+            if totals is not None:
+                self._track(table, user_id, totals, op)
+            if op[0] == "update":
+                changes = {k: v for k, v in op[2].items() if k in ("category", "amount")}
+                if "day" in op[2] or "date" in op[2]:
+                    changes["day"], changes["date"] = _dated(op[2])
+                assignments = ", ".join(f"{column} = ?" for column in changes)
+                self.conn.execute(
+                    f"UPDATE {table} SET {assignments} WHERE user_id = ? AND entry_id = ?",
+                    [*changes.values(), str(user_id), op[1]]
+                )
+            elif op[0] == "delete":
+                self.conn.execute(
+                    f"DELETE FROM {table} WHERE user_id = ? AND entry_id = ?", (str(user_id), op[1])
+                )
+
+    def _track(self, table, user_id, totals, op):
+        # оновлює закешовані підсумки до того, як зміна потрапить у таблицю
+        old = self.conn.execute(
+            f"SELECT category, amount, day FROM {table} WHERE user_id = ? AND entry_id = ?", (str(user_id), op[1])
+        ).fetchone()
+        if old is None:
+            return
+        category, amount, day = old
+        totals.remove(category_id(category), amount, day or 0)
+        if op[0] == "update":
+            changes = op[2]
+            if "day" in changes or "date" in changes:
+                day = _dated(changes)[0]
+            totals.add(
+                category_id(changes.get("category", category)), float(changes.get("amount", amount)), day or 0
+            )
+
+    def _insert(self, table, user_id, entries, ignore=False):
+        rows = []
+        for e in entries:
+            day, date = _dated(e)
+            rows.append((
+                str(user_id), e.get("category", "Без категорії"), float(e.get("amount", 0)),
+                date, day, e.get("id") or new_entry_id()
+            ))
+        verb = "INSERT OR IGNORE" if ignore else "INSERT"
+        return self.conn.executemany(
+            f"{verb} INTO {table} (user_id, category, amount, date, day, entry_id) VALUES (?, ?, ?, ?, ?, ?)", rows
+        ).rowcount
+
+    def find_entries(self, file_path, user_id, category=None, date_from=None, date_to=None):
+        table = self._ledger(file_path)
+        if not table:
+            raise ValueError(f"{file_path} не містить записів з датами")
+
+        query = f"SELECT {COLUMNS} FROM {table} WHERE user_id = ?"
+        params = [str(user_id)]
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category)
+        if date_from is not None:
+            query += " AND day >= ?"
+            params.append(date_from.toordinal())
+        if date_to is not None:
+            query += " AND day <= ?"
+            params.append(date_to.toordinal())
+        query += " ORDER BY day, rowid"
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [_row(r) for r in rows]
+
+    def iter_users(self, file_path):
+        table = self._ledger(file_path)
+        with self.lock:
+            if table:
+                user_ids = [r[0] for r in self.conn.execute(f"SELECT DISTINCT user_id FROM {table}")]
+            else:
+                return [
+                    (user_id, json.loads(value))
+                    for user_id, value in self.conn.execute(
+                        "SELECT user_id, value FROM documents WHERE name = ?", (file_key(file_path),)
+                    )
+                ]
+        return [(user_id, self.get_user_data(file_path, user_id, [])) for user_id in user_ids]
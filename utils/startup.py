@@ -0,0 +1,43 @@
+# Запуск бота: синхронізація слеш-команд лише тоді, коли дерево команд змінилось,
+# і журнал часу запуску (data/startup_times.jsonl), щоб порівнювати перезапуски.
+import hashlib
+import json
+import os
+import time
+
+from utils.helpers import DATA_PATH, write_json
+
+COMMAND_TREE_FILE = os.path.join(DATA_PATH, "command_tree.json")
+STARTUP_LOG_FILE = os.path.join(DATA_PATH, "startup_times.jsonl")
+
+
+def tree_fingerprint(tree, application_id):
+    commands = sorted(
+        (command.to_dict() for command in tree.get_commands()),
+        key=lambda c: (c.get("type", 1), c["name"])
+    )
+    payload = json.dumps([application_id, commands], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def sync_commands(tree, application_id):
+    # tree.sync() — REST-запит з жорстким лімітом; при перепідключеннях він не потрібен
+    fingerprint = tree_fingerprint(tree, application_id)
+    try:
+        with open(COMMAND_TREE_FILE, "r", encoding="utf-8") as f:
+            synced = json.load(f).get("fingerprint")
+    except (OSError, ValueError):
+        synced = None
+    if synced == fingerprint:
+        return False
+    await tree.sync()
+    write_json(COMMAND_TREE_FILE, {"fingerprint": fingerprint, "synced_at": int(time.time())})
+    return True
+
+
+def record_startup(started, **stages):
+    # stages — позначки time.perf_counter() етапів запуску
+    timings = {name: round(mark - started, 3) for name, mark in stages.items()}
+    with open(STARTUP_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"at": int(time.time()), **timings}) + "\n")
+    return timings
@@ -0,0 +1,174 @@
+from utils.async_store import store
+from utils.engine import top_n
+from utils.helpers import INCOME_FILE, EXPENSES_FILE, AUTO_INCOME_FILE
+
+INTERVAL_LABELS = {
+    "daily": "щодня",
+    "weekly": "щотижня",
+    "monthly": "щомісяця"
+}
+
+
+# Підсумок користувача для текстових звітів, діаграм і PDF — один на всі відображення.
+# Правила однакові всюди:
+#   • суми за категоріями — усі записи, включно з від'ємними (виправлення, повернення);
+#   • діаграми показують лише категорії з додатною сумою (кругова діаграма інакше не будується);
+#   • шаблони автоприбутків — це розклад, а не гроші: прибутком вважаються записи,
+#     які вони вже додали в income.json. Шаблони лише дають підписи категоріям.
+class Summary:
+    __slots__ = ("income", "expenses", "total_income", "total_expenses", "auto_labels")
+
+    def __init__(self, income, expenses, auto_templates=()):
+        self.income = income
+        self.expenses = expenses
+        self.total_income = sum(income.values())
+        self.total_expenses = sum(expenses.values())
+        self.auto_labels = {
+            e["category"]: f"{e['category']} [автоматично - {INTERVAL_LABELS.get(e.get('interval'), e.get('interval'))}]"
+            for e in auto_templates
+        }
+
+    @property
+    def balance(self):
+        return self.total_income - self.total_expenses
+
+    def income_chart(self):
+        return {cat: amount for cat, amount in self.income.items() if amount > 0}
+
+    def expense_chart(self):
+        return {cat: amount for cat, amount in self.expenses.items() if amount > 0}
+
+    def top_income(self):
+        return (top_n(self.income_chart(), 1) or [("None", 0)])[0]
+
+    def top_expense(self):
+        return (top_n(self.expense_chart(), 1) or [("None", 0)])[0]
+
+    def income_categories(self):
+        return sorted(self.income)
+
+    def expense_categories(self):
+        return sorted(self.expenses)
+
+    def labeled_income(self):
+        # категорії автоприбутків з підписом інтервалу
+        labeled = {}
+        for cat, amount in self.income.items():
+            label = self.auto_labels.get(cat, cat)
+            labeled[label] = labeled.get(label, 0) + amount
+        return labeled
+
+
+async def load_summary(user_id, date_from=None, date_to=None, income=True, expenses=True, cache=True):
+    # без періоду — з поточних підсумків (O(категорій)), з періодом — бінарний пошук по датах;
+    # cache=False — для масових разових читань (виписки), див. AsyncStore.sum_by_category
+    user_id = str(user_id)
+    income_sums = await store.sum_by_category(INCOME_FILE, user_id, date_from, date_to, cache) if income else {}
+    expense_sums = await store.sum_by_category(EXPENSES_FILE, user_id, date_from, date_to, cache) if expenses else {}
+    auto_templates = await store.get(AUTO_INCOME_FILE, user_id, []) if income else []
+    return Summary(income_sums, expense_sums, auto_templates)
+
+
+def month_label(month):
+    return f"{month % 12 + 1:02d}/{month // 12}"
+
+
+# Помісячна динаміка з місячних підсумків: сирі записи не читаються взагалі
+class TrendRow:
+    __slots__ = ("month", "income", "expenses", "top_expense")
+
+    def __init__(self, month, income, expenses, top_expense):
+        self.month = month
+        self.income = income
+        self.expenses = expenses
+        self.top_expense = top_expense
+
+    @property
+    def balance(self):
+        return self.income - self.expenses
+
+
+async def load_trend(user_id, first_month, last_month):
+    user_id = str(user_id)
+    income = await store.monthly_rollups(INCOME_FILE, user_id, first_month, last_month)
+    expenses = await store.monthly_rollups(EXPENSES_FILE, user_id, first_month, last_month)
+    # порожні місяці до першого запису користувача не показуємо; немає записів — немає рядків
+    months = income.keys() | expenses.keys()
+    if not months:
+        return []
+    first_month = max(first_month, min(months))
+    rows = []
+    for month in range(first_month, last_month + 1):
+        month_expenses = expenses.get(month, {})
+        top = top_n(month_expenses, 1)
+        rows.append(TrendRow(
+            month,
+            sum(income.get(month, {}).values()),
+            sum(month_expenses.values()),
+            top[0][0] if top else None
+        ))
+    return rows
+
+
+# Динаміка за днями/тижнями з денних підсумків Totals (бінарний пошук по датах).
+# Довгі періоди стискаються до SERIES_MAX_POINTS точок: для кожної групи сусідніх
+# днів/тижнів — середнє, мінімум і максимум, тож розмір графіка не залежить від кількості записів.
+SERIES_MAX_POINTS = 120
+SERIES_PERIODS = ("day", "week")
+
+
+def _period_start(day, period):
+    return day - (day - 1) % 7 if period == "week" else day  # ординал 1 — понеділок
+
+
+def _downsample(values, group):
+    # [(середнє, мінімум, максимум)] для кожних group значень поспіль
+    points = []
+    for i in range(0, len(values), group):
+        chunk = values[i:i + group]
+        points.append((sum(chunk) / len(chunk), min(chunk), max(chunk)))
+    return points
+
+
+class Series:
+    __slots__ = ("period", "group", "starts", "income", "expenses")
+
+    def __init__(self, period, group, starts, income, expenses):
+        self.period = period      # "day" або "week"
+        self.group = group        # скільки днів/тижнів в одній точці
+        self.starts = starts      # ординал першого дня кожної точки
+        self.income = income      # [(середнє, мінімум, максимум)]
+        self.expenses = expenses
+
+    def to_plain(self):
+        # прості дані для процесу малювання
+        return {
+            "period": self.period,
+            "group": self.group,
+            "starts": list(self.starts),
+            "income": [list(p) for p in self.income],
+            "expenses": [list(p) for p in self.expenses],
+        }
+
+
+def _bucketed(daily, period, starts):
+    index = {start: i for i, start in enumerate(starts)}
+    values = [0.0] * len(starts)
+    for day, amount in daily:
+        values[index[_period_start(day, period)]] += amount
+    return values
+
+
+async def load_series(user_id, date_from, date_to, period="day"):
+    if period not in SERIES_PERIODS:
+        raise ValueError(f"Невідомий період: {period}")
+    user_id = str(user_id)
+    first = _period_start(date_from.toordinal(), period)
+    step = 7 if period == "week" else 1
+    starts = list(range(first, date_to.toordinal() + 1, step))
+
+    income = _bucketed(await store.daily_totals(INCOME_FILE, user_id, date_from, date_to), period, starts)
+    expenses = _bucketed(await store.daily_totals(EXPENSES_FILE, user_id, date_from, date_to), period, starts)
+
+    group = -(-len(starts) // SERIES_MAX_POINTS)
+    return Series(period, group, starts[::group], _downsample(income, group), _downsample(expenses, group))